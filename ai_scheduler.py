@@ -0,0 +1,126 @@
+# ai_scheduler.py
+"""Уровни детализации ИИ врагов: кого обновлять в этом тике.
+
+Враги раз в AI_RETIER_INTERVAL тиков делятся на уровни по расстоянию до игрока и
+прямой видимости. Ближние и видящие игрока обновляются каждый тик, остальные - раз в
+AI_TIER_INTERVALS тиков по кругу, не больше AI_LAZY_BUDGET за тик; пропущенные тики
+догоняются увеличенным шагом. Урон и выстрел рядом будят врага сразу.
+Бюджет считается в обновлениях, а не во времени, чтобы тик оставался детерминированным.
+"""
+import numpy as np
+import constants as const
+
+ACTIVE, MID, FAR = 0, 1, 2
+ARRAYS = (('alive', bool), ('tier', np.int8), ('last_update', np.int64), ('awake_until', np.int64))
+
+
+class AIScheduler:
+    """Уровни врагов EntityController и выбор обновляемых в каждом тике."""
+    def __init__(self, entity_controller, capacity=64):
+        self.entity_controller = entity_controller
+        self.tick = 0
+        self.index_of = {}  # id(враг) -> номер в enemy_list
+        self.count = 0
+        self.capacity = capacity
+        # полные массивы ёмкости capacity; alive, tier, ... - их срезы [:count]
+        self.storage = {name: np.zeros(capacity, dtype=dtype) for name, dtype in ARRAYS}
+        self.alive = None
+        self.tier = None
+        self.last_update = None  # тик последнего обновления
+        self.awake_until = None  # до этого тика враг держится в ACTIVE
+        self.update_views()
+        self.intervals = np.array(const.AI_TIER_INTERVALS, dtype=np.int64)
+        self.cursor = 0  # откуда продолжать обход отложенных
+
+    def update_views(self):
+        """Срезы [:count] полных массивов под привычными именами."""
+        for name, _ in ARRAYS:
+            setattr(self, name, self.storage[name][:self.count])
+
+    def grow(self):
+        """Удваивает ёмкость массивов."""
+        self.capacity *= 2
+        for name, dtype in ARRAYS:
+            new = np.zeros(self.capacity, dtype=dtype)
+            new[:self.count] = self.storage[name][:self.count]
+            self.storage[name] = new
+
+    def add(self, enemy):
+        """Новый враг начинает с уровня ACTIVE до ближайшей переоценки."""
+        if self.count == self.capacity:
+            self.grow()
+        k = self.count
+        self.index_of[id(enemy)] = k
+        storage = self.storage
+        storage['alive'][k] = enemy.is_alive
+        storage['tier'][k] = ACTIVE
+        storage['last_update'][k] = self.tick
+        storage['awake_until'][k] = 0
+        self.count += 1
+        self.update_views()
+
+    def wake(self, enemy):
+        """Событие у врага (урон, шум): обновлять каждый тик ближайшие AI_WAKE_TICKS тиков."""
+        k = self.index_of.get(id(enemy))
+        if k is not None:
+            self.tier[k] = ACTIVE
+            self.awake_until[k] = self.tick + const.AI_WAKE_TICKS
+
+    def died(self, enemy):
+        """Погибший враг больше не обновляется."""
+        k = self.index_of.get(id(enemy))
+        if k is not None:
+            self.alive[k] = False
+
+    def positions(self):
+        """Координаты всех врагов массивами."""
+        controller = self.entity_controller
+        swarm = controller.swarm
+        if swarm is not None:
+            n = swarm.count
+            return swarm.x[:n], swarm.y[:n]
+        enemies = controller.enemy_list
+        return np.array([e.x for e in enemies], dtype=np.float64), np.array([e.y for e in enemies], dtype=np.float64)
+
+    def retier(self):
+        """Переоценка уровней по расстоянию до игрока и видимости."""
+        sim = self.entity_controller.simulation
+        avatar = sim.avatar
+        alive = self.alive
+        x, y = self.positions()
+        distance = np.hypot(x - avatar.x, y - avatar.y)
+        tier = np.where(distance <= const.AI_MID_DISTANCE, MID, FAR).astype(np.int8)
+        tier[distance <= const.AI_NEAR_DISTANCE] = ACTIVE
+        # видимость проверяется только там, где она может что-то изменить
+        check = np.flatnonzero(alive & (tier != ACTIVE) & (distance <= const.AI_VISIBLE_DISTANCE))
+        if check.size:
+            visible = sim.level.has_line_of_sight_many(avatar.x, avatar.y, x[check], y[check])
+            tier[check[visible]] = ACTIVE
+        tier[self.awake_until > self.tick] = ACTIVE
+        self.tier[:] = tier
+
+    def due(self):
+        """Номера живых врагов, обновляемых в этом тике, и число тиков, которое каждый догоняет."""
+        if self.alive.size <= const.AI_LOD_MIN_ENEMIES:
+            # на малом числе врагов деление на уровни дороже самого ИИ
+            idx = np.flatnonzero(self.alive)
+            self.last_update[idx] = self.tick
+            self.tick += 1
+            return idx, np.ones(idx.size, dtype=np.int64)
+        if self.tick % const.AI_RETIER_INTERVAL == 0:
+            self.retier()
+        tick = self.tick
+        alive = self.alive
+        elapsed = tick - self.last_update
+        active = np.flatnonzero(alive & (self.tier == ACTIVE))
+        overdue = np.flatnonzero(alive & (self.tier != ACTIVE) & (elapsed >= self.intervals[self.tier]))
+        if overdue.size > const.AI_LAZY_BUDGET:
+            # по кругу от места, где остановились в прошлый раз
+            start = np.searchsorted(overdue, self.cursor)
+            overdue = np.roll(overdue, -start)[:const.AI_LAZY_BUDGET]
+            self.cursor = int(overdue[-1]) + 1
+        idx = np.sort(np.concatenate([active, overdue]))
+        steps = np.clip(elapsed[idx], 1, const.AI_MAX_CATCHUP_STEPS)
+        self.last_update[idx] = tick
+        self.tick += 1
+        return idx, steps
\ No newline at end of file
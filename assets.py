@@ -0,0 +1,78 @@
+# assets.py
+"""Фоновая загрузка ресурсов с отчётом о прогрессе.
+
+Звуки, музыка и данные уровня грузятся в рабочем потоке, экран загрузки показывает
+долю завершённых задач. Звуки, не загруженные заранее, подгружаются при первом вызове;
+звук, который ещё грузится в фоне, не грузится второй раз, а дожидается фоновой загрузки.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import arcade
+import constants as const
+
+
+class AssetManager:
+    """Загрузчик ресурсов с одним фоновым потоком."""
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        self.sounds = {}        # имя -> arcade.Sound
+        self.sound_tasks = {}   # имя -> задача фоновой загрузки звука
+        self.lock = threading.Lock()  # sounds и sound_tasks меняются из обоих потоков
+        self.pending = []  # задачи текущей загрузки (для прогресса)
+
+    def submit(self, func, *args, **kwargs):
+        """Ставит загрузку в фоновый поток и учитывает её в прогрессе."""
+        future = self.executor.submit(func, *args, **kwargs)
+        self.pending.append(future)
+        return future
+
+    def preload_sounds(self, names):
+        """Загружает звуки в фоне."""
+        for name in names:
+            with self.lock:
+                if name in self.sounds or name in self.sound_tasks:
+                    continue
+                self.sound_tasks[name] = self.submit(self.load_sound, name)
+
+    def load_sound(self, name):
+        """Загружает звук по имени из SOUND_FILES (первый загруженный экземпляр остаётся в кэше)."""
+        with self.lock:
+            sound = self.sounds.get(name)
+        if sound is not None:
+            return sound
+        sound = arcade.load_sound(const.SOUND_FILES[name])
+        with self.lock:
+            self.sound_tasks.pop(name, None)
+            return self.sounds.setdefault(name, sound)
+
+    def sound(self, name):
+        """Звук по имени; грузящийся в фоне дожидается загрузки, не заказанный грузится сразу."""
+        with self.lock:
+            sound = self.sounds.get(name)
+            task = self.sound_tasks.get(name)
+        if sound is not None:
+            return sound
+        if task is not None and not task.cancelled():
+            return task.result()
+        return self.load_sound(name)
+
+    def load_music(self, path):
+        """Музыка в фоне с потоковым декодированием (файл не распаковывается в память целиком).
+
+        Потоковый источник играет только один раз, поэтому на каждый запуск грузится заново.
+        """
+        return self.submit(arcade.load_sound, path, streaming=True)
+
+    def start_batch(self):
+        """Начинает отсчёт прогресса заново, забывая завершённые задачи."""
+        self.pending = [f for f in self.pending if not f.done()]
+
+    def progress(self):
+        """Доля завершённых задач текущей загрузки (1.0, если ждать нечего)."""
+        if not self.pending:
+            return 1.0
+        return sum(f.done() for f in self.pending) / len(self.pending)
+
+    def shutdown(self):
+        """Останавливает фоновый поток, отменяя не начатые загрузки."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,86 @@
+# audio_mixer.py
+"""Микшер звуков игры: ограниченный пул голосов вместо play_sound на каждый запрос.
+
+Запросы за кадр собираются и сливаются по имени звука; раз в кадр flush запускает
+их по убыванию приоритета. У каждого звука есть предел одновременных голосов, весь
+пул ограничен AUDIO_MAX_VOICES: при нехватке вытесняется самый старый голос с
+приоритетом не выше нового, иначе новый звук отбрасывается.
+"""
+import math
+import time
+import arcade
+import constants as const
+
+
+class Voice:
+    """Играющий звук: имя, приоритет, плеер pyglet и время окончания."""
+    __slots__ = ('name', 'priority', 'player', 'started', 'ends')
+
+    def __init__(self, name, priority, player, started, ends):
+        self.name = name
+        self.priority = priority
+        self.player = player
+        self.started = started
+        self.ends = ends
+
+
+class AudioMixer:
+    """Пул голосов с пределами по звукам и слиянием одинаковых запросов за кадр."""
+    def __init__(self, assets, max_voices=const.AUDIO_MAX_VOICES, clock=time.monotonic):
+        self.assets = assets
+        self.max_voices = max_voices
+        self.clock = clock
+        self.voices = []   # играющие голоса в порядке запуска
+        self.pending = {}  # имя -> число запросов за текущий кадр
+        self.dropped = 0   # отброшенных запросов (для отладки и профиля)
+
+    def request(self, name):
+        """Запрос звука (обработчик звуков симуляции); звучит при следующем flush."""
+        self.pending[name] = self.pending.get(name, 0) + 1
+
+    def flush(self):
+        """Раз в кадр: убирает доигравшие голоса и запускает собранные запросы."""
+        if not self.pending:
+            return
+        now = self.clock()
+        self.voices = [v for v in self.voices if v.ends > now and v.player.playing]
+        settings = const.SOUND_SETTINGS
+        for name in sorted(self.pending, key=lambda n: -settings[n]['priority']):
+            self.start(name, self.pending[name], now)
+        self.pending.clear()
+
+    def start(self, name, count, now):
+        """Запускает один голос на count слитых запросов, освобождая место по правилам вытеснения."""
+        params = const.SOUND_SETTINGS[name]
+        priority = params['priority']
+        same = [v for v in self.voices if v.name == name]
+        if len(same) >= params['max_voices']:
+            # свой предел: перезапуск вместо самого старого голоса этого звука
+            self.stop_voice(same[0])
+        elif len(self.voices) >= self.max_voices:
+            victim = min((v for v in self.voices if v.priority <= priority),
+                         key=lambda v: (v.priority, v.started), default=None)
+            if victim is None:
+                self.dropped += count
+                return
+            self.stop_voice(victim)
+        sound = self.assets.sound(name)
+        # слитые запросы звучат громче, но не больше полной громкости
+        volume = min(1.0, params['volume'] * (1 + const.AUDIO_MERGE_GAIN * math.log2(count)))
+        player = arcade.play_sound(sound, volume=volume)
+        if player is None:
+            self.dropped += count
+            return
+        self.voices.append(Voice(name, priority, player, now, now + sound.get_length()))
+
+    def stop_voice(self, voice):
+        """Останавливает голос и освобождает его место в пуле."""
+        arcade.stop_sound(voice.player)
+        self.voices.remove(voice)
+
+    def stop_all(self):
+        """Останавливает все голоса и забывает несыгранные запросы."""
+        for voice in self.voices:
+            arcade.stop_sound(voice.player)
+        self.voices.clear()
+        self.pending.clear()
\ No newline at end of file
@@ -1,26 +1,36 @@
 # avatar.py
 import arcade
 import math
+import collision
 import constants as const
+from events import AvatarDamaged
 
 
 class Avatar:
     """Игровой персонаж."""
-    def __init__(self, main_game):
-        self.main_game = main_game
+    def __init__(self, simulation):
+        self.simulation = simulation
         self.x, self.y = 0, 0
+        self.prev_x, self.prev_y = 0, 0  # положение на предыдущем тике
         self.angle = 0
         self.shot = False
         self.hp = const.AVATAR_MAX_HEALTH
         self.health_recovery_delay = 700  # мс
         self.time_prev = 0
-        self.shots_fired = 0
-        self.damage_taken = 0
 
     def set_coordinates(self, x, y):
         """Устанавливает позицию в клетках."""
         self.x = x * const.CELL_SIZE
         self.y = y * const.CELL_SIZE
+        self.prev_x, self.prev_y = self.x, self.y
+
+    def store_previous_position(self):
+        """Запоминает положение перед тиком (для интерполяции при отрисовке)."""
+        self.prev_x, self.prev_y = self.x, self.y
+
+    def render_position(self, alpha):
+        """Положение между двумя последними тиками (alpha от 0 до 1)."""
+        return self.prev_x + (self.x - self.prev_x) * alpha, self.prev_y + (self.y - self.prev_y) * alpha
 
     def heal_over_time(self, delta_time):
         """Восстановление здоровья со временем."""
@@ -29,46 +39,18 @@ class Avatar:
             self.time_prev = 0
             self.hp += 1
 
-    def check_defeat(self):
-        """Проверка условия поражения."""
-        if self.hp < 1:
-            self.main_game.state = "GAME_OVER"
-
-    def apply_damage(self, amount):
-        """Получение урона."""
+    def apply_damage(self, amount, source=None):
+        """Получение урона (source - атаковавший враг); поражение и звук - у подписчиков AvatarDamaged."""
         self.hp -= amount
-        self.damage_taken += amount
-        arcade.play_sound(self.main_game.avatar_pain_sound)
-        self.check_defeat()
+        self.simulation.events.publish(AvatarDamaged(amount, source))
 
     def can_step_to(self, new_x, new_y):
         """Проверка возможности перемещения в точку."""
         r = const.AVATAR_SIZE
-        min_i = int((new_x - r) // const.CELL_SIZE)
-        max_i = int((new_x + r) // const.CELL_SIZE)
-        min_j = int((new_y - r) // const.CELL_SIZE)
-        max_j = int((new_y + r) // const.CELL_SIZE)
-        # стены
-        for i in range(min_i, max_i + 1):
-            for j in range(min_j, max_j + 1):
-                if (i, j) in self.main_game.level.world_map:
-                    tile_cx = i * const.CELL_SIZE
-                    tile_cy = j * const.CELL_SIZE
-                    half = const.CELL_SIZE // 2
-                    left = tile_cx - half
-                    right = tile_cx + half
-                    bottom = tile_cy - half
-                    top = tile_cy + half
-                    closest_x = max(left, min(new_x, right))
-                    closest_y = max(bottom, min(new_y, top))
-                    dx = new_x - closest_x
-                    dy = new_y - closest_y
-                    if dx * dx + dy * dy < r * r:
-                        return False
+        if collision.circle_hits_walls(self.simulation.level, new_x, new_y, r):
+            return False
         # враги
-        for enemy in self.main_game.entity_controller.enemy_list:
-            if not enemy.is_alive:
-                continue
+        for enemy in self.simulation.entity_controller.enemies_near(new_x, new_y, r):
             dx = new_x - enemy.x
             dy = new_y - enemy.y
             dist2 = dx*dx + dy*dy
@@ -77,31 +59,18 @@ class Avatar:
         return True
 
     def handle_movement(self):
-        """Обработка перемещения по клавишам."""
+        """Обработка перемещения по направлению из ввода тика."""
         speed = const.AVATAR_SPEED
-        dx, dy = 0, 0
-        if arcade.key.W in self.main_game.keys_pressed:
-            dy += speed
-        if arcade.key.S in self.main_game.keys_pressed:
-            dy -= speed
-        if arcade.key.A in self.main_game.keys_pressed:
-            dx -= speed
-        if arcade.key.D in self.main_game.keys_pressed:
-            dx += speed
+        dx = self.simulation.input.move_x * speed
+        dy = self.simulation.input.move_y * speed
         if dx != 0 and dy != 0:
             dx *= 0.7071
             dy *= 0.7071
-        new_x = self.x + dx
-        new_y = self.y + dy
-        if self.can_step_to(new_x, self.y):
-            self.x = new_x
-        if self.can_step_to(self.x, new_y):
-            self.y = new_y
+        self.x, self.y = collision.move_and_slide(self.x, self.y, dx, dy, const.AVATAR_SIZE, self.can_step_to)
 
     def aim_with_mouse(self):
-        """Управление направлением взгляда с помощью мыши."""
-        mx, my = self.main_game.mouse_pos
-        self.angle = math.atan2(my - const.SCR_HH, mx - const.SCR_HW)
+        """Управление направлением взгляда (угол приходит во вводе тика)."""
+        self.angle = self.simulation.input.angle
 
     def update_state(self, delta_time):
         """Обновление состояния игрока."""
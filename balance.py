@@ -0,0 +1,228 @@
+# balance.py
+"""Монте-Карло прогон матчей без окна и звука для настройки врагов и очков.
+
+Матчи уровня делятся на пачки и раздаются процессам пула. Seed матча выводится из
+базового seed, номера уровня и номера матча, поэтому результат не зависит от числа
+процессов и порядка выполнения. Итог - столбцы NumPy (по элементу на матч) в .npz.
+
+Запуск:
+    python balance.py                          # по 1000 матчей на каждый уровень, бот
+    python balance.py --levels 0 2 --matches 5000 --out balance.npz
+    python balance.py --policy scripted --workers 4
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import constants as const
+import hitscan
+import level_file
+from benchmark import scripted_input
+from simulation import Simulation, TickInput
+
+BASE_SEED = 20240501
+MAX_MATCH_TIME = 180   # сек игрового времени, дальше матч считается ничьей
+BATCH_SIZE = 25        # матчей в одной задаче пула
+BOT_FIRE_INTERVAL = 30  # тиков между выстрелами (как у scripted_input в benchmark.py)
+BOT_KEEP_DISTANCE = const.GUN_FALLOFF_START  # ближе бот не подходит к врагу, в которого может попасть
+BOT_STUCK_TICKS = 60   # тиков без приближения к цели, после которых бот считается застрявшим
+BOT_WANDER_TICKS = 40  # сколько тиков застрявший бот идёт в случайную сторону
+# столбцы результата: имя -> тип
+COLUMNS = {
+    'level_id': np.int16,
+    'seed': np.uint64,
+    'won': np.bool_,
+    'lost': np.bool_,
+    'ticks': np.int32,
+    'time': np.float64,      # время матча, сек
+    'kills': np.int32,
+    'enemies': np.int32,
+    'damage_taken': np.float64,
+    'hp_left': np.float64,
+    'shots': np.int32,
+    'score': np.int64,
+}
+
+
+def match_seed(base_seed, level_id, index):
+    """Seed матча, не зависящий от того, какой процесс его играет."""
+    state = np.random.SeedSequence([base_seed, level_id, index]).generate_state(2, dtype=np.uint32)
+    return (int(state[0]) << 31) ^ int(state[1])
+
+
+class BotPolicy:
+    """Простой бот: стреляет, когда луч выстрела попадает во врага, иначе идёт к ближайшему врагу по графу клеток."""
+    def __init__(self, seed):
+        self.rng = random.Random(seed)  # свой генератор, rng симуляции не трогается
+        self.route = None  # (клетка игрока, клетка цели, следующая клетка)
+        self.last_shot = -BOT_FIRE_INTERVAL
+        self.best_distance = math.inf  # ближайшее расстояние до цели с последнего продвижения
+        self.idle = 0
+        self.wander = 0
+        self.wander_move = (0, 0)
+
+    def __call__(self, sim, tick):
+        avatar = sim.avatar
+        target, distance = self.nearest_enemy(sim)
+        if target is None:
+            return TickInput(0, 0, avatar.angle, False)
+        dx = target.x - avatar.x
+        dy = target.y - avatar.y
+        angle = math.atan2(dy, dx)
+        clear_shot = hitscan.cast(sim, avatar.x, avatar.y, angle, const.GUN_RANGE).enemy is not None
+        if distance < self.best_distance - 1 or clear_shot:
+            self.best_distance = distance
+            self.idle = 0
+        else:
+            self.idle += 1
+        if self.wander:
+            self.wander -= 1
+            move_x, move_y = self.wander_move
+        elif clear_shot and distance <= BOT_KEEP_DISTANCE:
+            move_x, move_y = 0, 0
+        elif self.idle >= BOT_STUCK_TICKS:
+            self.idle = 0
+            self.best_distance = math.inf
+            self.wander = BOT_WANDER_TICKS
+            self.wander_move = (self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1)))
+            move_x, move_y = self.wander_move
+        else:
+            move_x, move_y = self.route_step(sim, target)
+        fire = clear_shot and tick - self.last_shot >= BOT_FIRE_INTERVAL
+        if fire:
+            self.last_shot = tick
+        return TickInput(move_x, move_y, angle, fire)
+
+    def route_step(self, sim, target):
+        """Направление к центру следующей клетки пути до цели (путь пересчитывается при смене клеток)."""
+        avatar = sim.avatar
+        solver = sim.path_solver
+        start = solver.cell_at(avatar.x, avatar.y)
+        goal = solver.cell_at(target.x, target.y)
+        if self.route is None or self.route[:2] != (start, goal):
+            self.route = (start, goal, solver.find_path(start, goal))
+        next_i, next_j = self.route[2]
+        if (next_i, next_j) == start:
+            dx, dy = target.x - avatar.x, target.y - avatar.y
+        else:
+            dx, dy = next_i * const.CELL_SIZE - avatar.x, next_j * const.CELL_SIZE - avatar.y
+        return (sign(dx) if abs(dx) > const.AVATAR_SPEED else 0), (sign(dy) if abs(dy) > const.AVATAR_SPEED else 0)
+
+    @staticmethod
+    def nearest_enemy(sim):
+        """Ближайший живой враг и расстояние до него."""
+        avatar = sim.avatar
+        best, best_d = None, math.inf
+        for enemy in sim.entity_controller.enemy_list:
+            if enemy.is_alive:
+                d = math.hypot(enemy.x - avatar.x, enemy.y - avatar.y)
+                if d < best_d:
+                    best, best_d = enemy, d
+        return best, best_d
+
+
+class ScriptedPolicy:
+    """Детерминированный ввод из benchmark.scripted_input (одинаков для всех seed)."""
+    def __init__(self, seed):
+        pass
+
+    def __call__(self, sim, tick):
+        return scripted_input(tick)
+
+
+POLICIES = {'bot': BotPolicy, 'scripted': ScriptedPolicy}
+
+
+def sign(value):
+    """-1, 0 или 1 по знаку числа."""
+    return (value > 0) - (value < 0)
+
+
+def play_match(level_id, seed, policy_name, vectorized_ai=False):
+    """Один матч до победы, поражения или MAX_MATCH_TIME; возвращает строку результата."""
+    sim = Simulation(level_id, seed=seed, vectorized_ai=vectorized_ai)
+    policy = POLICIES[policy_name](seed)
+    dt = 1 / const.UPDATE_RATE
+    max_ticks = MAX_MATCH_TIME * const.UPDATE_RATE
+    tick = 0
+    while sim.state == "PLAYING" and tick < max_ticks:
+        sim.step(dt, policy(sim, tick))
+        tick += 1
+    avatar = sim.avatar
+    return (level_id, seed, sim.state == "WIN", sim.state == "GAME_OVER", tick, sim.time_played,
+            sim.total_kills, sim.stats.enemies, sim.stats.damage_taken, max(avatar.hp, 0),
+            sim.stats.shots_fired, sim.compute_score())
+
+
+def play_batch(level_id, base_seed, first, count, policy_name, vectorized_ai):
+    """Задача процесса пула: матчи first..first+count-1 уровня."""
+    return [play_match(level_id, match_seed(base_seed, level_id, index), policy_name, vectorized_ai)
+            for index in range(first, first + count)]
+
+
+def warm_caches(level_ids):
+    """Считает кэши уровней (таблицы видимости) в главном процессе, чтобы процессы пула их только читали."""
+    for level_id in level_ids:
+        Simulation(level_id, seed=0)
+
+
+def run(level_ids, matches, policy_name='bot', workers=None, base_seed=BASE_SEED, vectorized_ai=False):
+    """Играет matches матчей на каждом уровне; возвращает словарь столбцов."""
+    warm_caches(level_ids)
+    tasks = [(level_id, base_seed, first, min(BATCH_SIZE, matches - first), policy_name, vectorized_ai)
+             for level_id in level_ids for first in range(0, matches, BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = [row for batch in pool.map(play_batch, *zip(*tasks)) for row in batch]
+    return {name: np.array([row[k] for row in rows], dtype=dtype) for k, (name, dtype) in enumerate(COLUMNS.items())}
+
+
+def summarize(columns):
+    """Сводка по уровням: доля побед, время прохождения, урон и распределение очков."""
+    lines = []
+    for level_id in np.unique(columns['level_id']):
+        mask = columns['level_id'] == level_id
+        won = columns['won'][mask]
+        clear = columns['time'][mask][won]
+        damage = columns['damage_taken'][mask]
+        score = columns['score'][mask]
+        line = (f"Уровень {level_id}: матчей {mask.sum()}, побед {won.mean():.1%}, "
+                f"поражений {columns['lost'][mask].mean():.1%}")
+        if clear.size:
+            line += f", прохождение p50 {np.median(clear):.1f} с (p90 {np.percentile(clear, 90):.1f} с)"
+        line += (f", урон в среднем {damage.mean():.0f}, очки p10/p50/p90 "
+                 f"{np.percentile(score, 10):.0f}/{np.percentile(score, 50):.0f}/{np.percentile(score, 90):.0f}")
+        lines.append(line)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный прогон матчей для настройки баланса.")
+    parser.add_argument('--levels', type=int, nargs='*', help="номера уровней (по умолчанию все)")
+    parser.add_argument('--matches', type=int, default=1000, help="матчей на уровень")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='bot', help="ввод игрока")
+    parser.add_argument('--workers', type=int, help="процессов (по умолчанию - по числу ядер)")
+    parser.add_argument('--seed', type=int, default=BASE_SEED, help="базовый seed")
+    parser.add_argument('--vectorized', action='store_true', help="векторный ИИ врагов")
+    parser.add_argument('--out', help="сохранить столбцы результатов в .npz")
+    args = parser.parse_args()
+
+    level_ids = args.levels if args.levels else [level_id for level_id, _ in level_file.level_catalog()]
+    start = time.perf_counter()
+    columns = run(level_ids, args.matches, args.policy, args.workers, args.seed, args.vectorized)
+    total = time.perf_counter() - start
+    ticks = int(columns['ticks'].sum())
+    print(f"{columns['ticks'].size} матчей, {ticks} тиков за {total:.1f} с "
+          f"({ticks / total:.0f} тиков/с, процессов {args.workers or os.cpu_count()})")
+    for line in summarize(columns):
+        print(line)
+    if args.out:
+        np.savez(args.out, **columns)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
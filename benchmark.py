@@ -0,0 +1,363 @@
+# benchmark.py
+"""Детерминированные замеры горячих участков тика без окна.
+
+Запуск:
+    python benchmark.py                  # все сценарии, сравнение с базой
+    python benchmark.py --save           # сохранить результаты как новую базу
+    python benchmark.py --only castle synthetic_256
+    python benchmark.py --check          # только проверки правильности, без замеров
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+import numpy as np
+import constants as const
+import hitscan
+from enemies import SoldierEnemy, CacoDemonEnemy, CyberDemonEnemy
+from path_solver import PathSolver
+from raycaster import Raycaster
+from simulation import Simulation, TickInput
+
+BASELINE_FILE = "benchmark_baseline.json"
+SEED = 12345
+MIN_TIME = 0.2       # минимальное время одного замера, сек
+MAX_OPS = 200000     # верхняя граница числа операций в замере
+CHUNK = 50           # операций между проверками времени
+TICK_DT = 1 / const.UPDATE_RATE
+
+
+def make_synthetic_map(size, rng, wall_density=0.18):
+    """Квадратная карта size x size со стенами по краям и случайными блоками внутри."""
+    mini_map = []
+    for j in range(size):
+        row = []
+        for i in range(size):
+            if i in (0, size - 1) or j in (0, size - 1):
+                row.append(1)
+            elif rng.random() < wall_density:
+                row.append(rng.randint(1, 5))
+            else:
+                row.append(0)
+        mini_map.append(row)
+    # свободная зона вокруг центра для игрока
+    c = size // 2
+    for j in range(c - 2, c + 3):
+        for i in range(c - 2, c + 3):
+            mini_map[j][i] = 0
+    return mini_map
+
+
+def free_cells(sim):
+    """Список свободных клеток уровня."""
+    return [(i, j) for j, row in enumerate(sim.level.mini_map) for i, v in enumerate(row) if not v]
+
+
+def build_shipped(level_id):
+    """Сценарий на одной из поставляемых карт с её врагами."""
+    return Simulation(level_id, seed=SEED)
+
+
+def build_synthetic(size, enemy_count, vectorized_ai=False):
+    """Сценарий на синтетической карте с заданным числом врагов."""
+    rng = random.Random(SEED + size)
+    sim = Simulation(-1, seed=SEED, mini_map=make_synthetic_map(size, rng), vectorized_ai=vectorized_ai)
+    c = size // 2
+    sim.avatar.set_coordinates(c, c)
+    cells = [cell for cell in free_cells(sim) if max(abs(cell[0] - c), abs(cell[1] - c)) > 2]
+    rng.shuffle(cells)
+    types = [SoldierEnemy, SoldierEnemy, SoldierEnemy, CacoDemonEnemy, CyberDemonEnemy]
+    controller = sim.entity_controller
+    for cell in cells[:enemy_count]:
+        controller.add_enemy(rng.choice(types)(sim, cell))
+    return sim
+
+
+SCENARIOS = {
+    'castle': lambda: build_shipped(0),
+    'maze': lambda: build_shipped(1),
+    'base': lambda: build_shipped(2),
+    'synthetic_64': lambda: build_synthetic(64, 50),
+    'synthetic_128': lambda: build_synthetic(128, 200),
+    'synthetic_256': lambda: build_synthetic(256, 500),
+    'swarm_256': lambda: build_synthetic(256, 3000, vectorized_ai=True),
+}
+
+
+def scripted_input(tick):
+    """Детерминированный ввод игрока: движение по кругу и выстрел раз в полсекунды."""
+    phase = (tick // 90) % 4
+    move_x = (1, 0, -1, 0)[phase]
+    move_y = (0, 1, 0, -1)[phase]
+    return TickInput(move_x, move_y, tick * 0.05, tick % 30 == 0)
+
+
+def random_points(sim, rng, count):
+    """Случайные точки в свободных клетках уровня (мировые координаты)."""
+    cells = free_cells(sim)
+    points = []
+    for _ in range(count):
+        i, j = rng.choice(cells)
+        points.append(((i + rng.random()) * const.CELL_SIZE, (j + rng.random()) * const.CELL_SIZE))
+    return points
+
+
+def measure(func, args_list):
+    """Гоняет func по кругу по списку аргументов, пока не наберётся MIN_TIME; возвращает (ops, сек)."""
+    ops = 0
+    total = 0.0
+    n = len(args_list)
+    while total < MIN_TIME and ops < MAX_OPS:
+        chunk = [args_list[(ops + k) % n] for k in range(CHUNK)]
+        start = time.perf_counter()
+        for args in chunk:
+            func(*args)
+        total += time.perf_counter() - start
+        ops += CHUNK
+    return ops, total
+
+
+def bench_tick(make_sim):
+    """Полный тик Simulation.step (ticks/sec)."""
+    sim = make_sim()
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        sim.step(TICK_DT, scripted_input(ops))
+        ops += 1
+        if sim.state != "PLAYING":
+            sim = make_sim()
+        total = time.perf_counter() - start
+        if total >= MIN_TIME * 2 or ops >= MAX_OPS:
+            return ops, total
+
+
+def bench_avatar_step(make_sim):
+    """Avatar.can_step_to в случайных точках."""
+    sim = make_sim()
+    points = random_points(sim, random.Random(SEED), 2000)
+    return measure(sim.avatar.can_step_to, points)
+
+
+def bench_enemy_step(make_sim):
+    """EnemyBase.can_step_to в случайных точках для случайных врагов."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    enemies = sim.entity_controller.enemy_list
+    args = [(rng.choice(enemies).can_step_to, p) for p in random_points(sim, rng, 2000)]
+    return measure(lambda f, p: f(*p), args)
+
+
+def bench_visibility(make_sim):
+    """Simulation.check_visibility между случайными точками."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    points = random_points(sim, rng, 4000)
+    world_map = sim.level.world_map
+    args = [(a[0], a[1], b[0], b[1], world_map) for a, b in zip(points[::2], points[1::2])]
+    return measure(sim.check_visibility, args)
+
+
+def bench_hitscan(make_sim):
+    """hitscan.cast из случайных точек в случайных направлениях."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    args = [(sim, x, y, rng.uniform(-math.pi, math.pi), const.GUN_RANGE) for x, y in random_points(sim, rng, 2000)]
+    return measure(hitscan.cast, args)
+
+
+def check_raycast_orientation():
+    """Стена и враг впереди слева от игрока (взгляд по оси x) должны попасть в левую половину кадра."""
+    cs = const.CELL_SIZE
+    grid = np.zeros((11, 11), dtype=np.int64)
+    grid[6, 8] = 1  # клетка (8, 6): игрок в (5, 5), стена впереди и левее
+    raycaster = Raycaster(SimpleNamespace(grid=grid))
+    _, texture, _ = raycaster.cast(5 * cs, 5 * cs, 0.0)
+    wall_columns = np.flatnonzero(texture)
+    empty = Raycaster(SimpleNamespace(grid=np.zeros_like(grid)))
+    before = empty.render(5 * cs, 5 * cs, 0.0).copy()
+    after = empty.render(5 * cs, 5 * cs, 0.0, [(8 * cs, 6 * cs, 10, (255, 0, 0))])
+    enemy_columns = np.flatnonzero((before != after).any(axis=(0, 2)))
+    half = raycaster.width / 2
+    for name, columns in (('стена', wall_columns), ('враг', enemy_columns)):
+        if not columns.size or columns.max() >= half:
+            raise RuntimeError(f"Raycaster: {name} слева от игрока не в левой половине кадра "
+                               f"(столбцы {columns.min() if columns.size else '-'}-"
+                               f"{columns.max() if columns.size else '-'} из {raycaster.width})")
+
+
+def bench_raycast(make_sim):
+    """Raycaster.render: кадр вида от первого лица с врагами (frames/sec без загрузки в GPU)."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    raycaster = Raycaster(sim.level)
+    billboards = [(e.x, e.y, e.size, e.color) for e in sim.entity_controller.enemy_list if e.is_alive]
+    args = [(x, y, rng.uniform(-math.pi, math.pi), billboards) for x, y in random_points(sim, rng, 200)]
+    return measure(raycaster.render, args)
+
+
+def bench_cell_line(make_sim):
+    """Simulation.get_cell_line между случайными клетками."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    cells = free_cells(sim)
+    args = [rng.choice(cells) + rng.choice(cells) for _ in range(2000)]
+    return measure(sim.get_cell_line, args)
+
+
+def bench_build_graph(make_sim):
+    """PathSolver.build_graph (построение графа проходимости всей карты)."""
+    sim = make_sim()
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        PathSolver(sim).build_graph()
+        ops += 1
+        total = time.perf_counter() - start
+        if total >= MIN_TIME or ops >= MAX_OPS:
+            return ops, total
+
+
+def bench_find_path(make_sim):
+    """PathSolver.find_path между случайными парами свободных клеток (каждая пара один раз)."""
+    sim = make_sim()
+    rng = random.Random(SEED)
+    cells = free_cells(sim)
+    ops = 0
+    total = 0.0
+    solver = PathSolver(sim)
+    while total < MIN_TIME and ops < MAX_OPS:
+        s, g = rng.choice(cells), rng.choice(cells)
+        start = time.perf_counter()
+        solver.find_path(s, g)
+        total += time.perf_counter() - start
+        ops += 1
+    return ops, total
+
+
+def bench_update_all(make_sim):
+    """EntityController.update_all при неподвижном игроке."""
+    sim = make_sim()
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        sim.entity_controller.update_all(TICK_DT)
+        ops += 1
+        total = time.perf_counter() - start
+        if total >= MIN_TIME or ops >= MAX_OPS:
+            return ops, total
+
+
+BENCHMARKS = {
+    'tick': bench_tick,
+    'avatar_can_step_to': bench_avatar_step,
+    'enemy_can_step_to': bench_enemy_step,
+    'check_visibility': bench_visibility,
+    'hitscan': bench_hitscan,
+    'raycast': bench_raycast,
+    'get_cell_line': bench_cell_line,
+    'build_graph': bench_build_graph,
+    'find_path': bench_find_path,
+    'update_all': bench_update_all,
+}
+
+
+CHECKS = {
+    'raycast_orientation': check_raycast_orientation,
+}
+
+
+def run_checks():
+    """Прогоняет проверки правильности; возвращает число проваленных."""
+    failed = 0
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except RuntimeError as e:
+            failed += 1
+            print(f"{name:<24} ОШИБКА: {e}")
+        else:
+            print(f"{name:<24} ок")
+    return failed
+
+
+def peak_memory(make_sim, ticks=30):
+    """Пиковый объём памяти Python (КБ) на создание сценария и ticks тиков."""
+    tracemalloc.start()
+    sim = make_sim()
+    for tick in range(ticks):
+        sim.step(TICK_DT, scripted_input(tick))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def run(scenario_names):
+    """Прогоняет все замеры для выбранных сценариев и возвращает словарь результатов."""
+    results = {}
+    for scenario in scenario_names:
+        make_sim = SCENARIOS[scenario]
+        for name, bench in BENCHMARKS.items():
+            random.seed(SEED)
+            ops, total = bench(make_sim)
+            ns_per_op = total / ops * 1e9
+            results[f"{scenario}/{name}"] = {'ns_per_op': ns_per_op, 'ops_per_sec': ops / total}
+            print(f"{scenario:>14} {name:<20} {ns_per_op:14.0f} ns/op {ops / total:14.1f} op/s")
+        random.seed(SEED)
+        peak = peak_memory(make_sim)
+        results[f"{scenario}/peak_memory_kb"] = {'kb': peak}
+        print(f"{scenario:>14} {'peak_memory':<20} {peak:14.0f} KB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Сравнивает результаты с базой; возвращает список регрессий."""
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        metric = 'kb' if 'kb' in value else 'ns_per_op'
+        if old[metric] > 0 and value[metric] > old[metric] * (1 + tolerance):
+            regressions.append((key, metric, old[metric], value[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности тика без окна.")
+    parser.add_argument('--only', nargs='+', choices=list(SCENARIOS), help="запустить только эти сценарии")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="файл базовых результатов")
+    parser.add_argument('--save', action='store_true', help="сохранить результаты как новую базу")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="допустимое ухудшение (доля)")
+    parser.add_argument('--check', action='store_true', help="только проверки правильности, без замеров")
+    args = parser.parse_args()
+
+    if args.check:
+        return 1 if run_checks() else 0
+
+    results = run(args.only or list(SCENARIOS))
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"База сохранена в {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("База не найдена, сравнение пропущено (запустите с --save).")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for key, metric, old, new in regressions:
+        print(f"РЕГРЕССИЯ {key}: {metric} {old:.0f} -> {new:.0f} ({(new / old - 1) * 100:+.0f}%)")
+    if not regressions:
+        print("Регрессий нет.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,97 @@
+# collision.py
+"""Общие проверки столкновений кругов со стенами уровня для игрока и врагов.
+
+Стена (i, j) - квадрат CELL_SIZE с центром в (i, j) * CELL_SIZE. Проверяются клетки,
+в которые попадает ограничивающий квадрат круга при делении координат на CELL_SIZE.
+"""
+import math
+import numpy as np
+import constants as const
+
+
+def circle_hits_walls(level, x, y, r):
+    """Пересекает ли круг (x, y, r) какую-либо стену уровня."""
+    cs = const.CELL_SIZE
+    half = cs // 2
+    cols = level.cols
+    occupancy = level.occupancy
+    min_i = max(int((x - r) // cs), 0)
+    max_i = min(int((x + r) // cs), cols - 1)
+    min_j = max(int((y - r) // cs), 0)
+    max_j = min(int((y + r) // cs), level.rows - 1)
+    r2 = r * r
+    for j in range(min_j, max_j + 1):
+        base = j * cols
+        for i in range(min_i, max_i + 1):
+            if occupancy[base + i]:
+                tile_cx = i * cs
+                tile_cy = j * cs
+                dx = x - max(tile_cx - half, min(x, tile_cx + half))
+                dy = y - max(tile_cy - half, min(y, tile_cy + half))
+                if dx * dx + dy * dy < r2:
+                    return True
+    return False
+
+
+def circles_hit_walls(level, xs, ys, rs):
+    """Пакетная версия circle_hits_walls для массивов кругов; возвращает массив bool."""
+    cs = const.CELL_SIZE
+    half = cs // 2
+    walls = level.walls
+    rows, cols = walls.shape
+    hits = np.zeros(xs.size, dtype=bool)
+    i_lo = np.floor((xs - rs) / cs).astype(np.int64)
+    i_hi = np.floor((xs + rs) / cs).astype(np.int64)
+    j_lo = np.floor((ys - rs) / cs).astype(np.int64)
+    j_hi = np.floor((ys + rs) / cs).astype(np.int64)
+    # радиус меньше половины клетки, поэтому диапазон не шире двух клеток по оси
+    for ti, ti_valid in ((i_lo, True), (i_hi, i_hi != i_lo)):
+        for tj, tj_valid in ((j_lo, True), (j_hi, j_hi != j_lo)):
+            inside = (ti >= 0) & (ti < cols) & (tj >= 0) & (tj < rows) & ti_valid & tj_valid
+            wall = np.zeros(xs.size, dtype=bool)
+            wall[inside] = walls[tj[inside], ti[inside]]
+            cx = np.clip(xs, ti * cs - half, ti * cs + half)
+            cy = np.clip(ys, tj * cs - half, tj * cs + half)
+            hits |= wall & ((xs - cx) ** 2 + (ys - cy) ** 2 < rs * rs)
+    return hits
+
+
+def move_and_slide(x, y, dx, dy, r, can_step_to):
+    """Перемещение круга на (dx, dy) со скольжением вдоль препятствий.
+
+    Путь делится на шаги не длиннее r / 2, чтобы круг не проскакивал сквозь стену;
+    на каждом шаге оси пробуются по очереди (сначала x, затем y).
+    """
+    steps = max(1, math.ceil(max(abs(dx), abs(dy)) / (r / 2)))
+    step_x = dx / steps
+    step_y = dy / steps
+    for _ in range(steps):
+        if step_x and can_step_to(x + step_x, y):
+            x += step_x
+        if step_y and can_step_to(x, y + step_y):
+            y += step_y
+    return x, y
+
+
+def move_and_slide_many(xs, ys, idx, dxs, dys, rs, can_step_to, moved=None):
+    """Пакетная версия move_and_slide для объектов idx; xs, ys меняются на месте.
+
+    can_step_to(idx, nx, ny) проверяет массив целевых точек и возвращает массив bool;
+    moved(idx), если задан, вызывается после каждого сдвига с номерами сдвинутых объектов.
+    """
+    if not idx.size:
+        return
+    steps = max(1, math.ceil(float(np.max(np.maximum(np.abs(dxs), np.abs(dys)) / (rs / 2)))))
+    step_x = dxs / steps
+    step_y = dys / steps
+    for _ in range(steps):
+        nx = xs[idx] + step_x
+        ok = can_step_to(idx, nx, ys[idx])
+        xs[idx[ok]] = nx[ok]
+        if moved is not None:
+            moved(idx[ok])
+        ny = ys[idx] + step_y
+        ok = can_step_to(idx, xs[idx], ny)
+        ys[idx[ok]] = ny[ok]
+        if moved is not None:
+            moved(idx[ok])
\ No newline at end of file
@@ -5,106 +5,100 @@ import math
 SCR_W, SCR_H = 1600, 900
 SCR_HW = SCR_W // 2
 SCR_HH = SCR_H // 2
-UPDATE_RATE = 60
+UPDATE_RATE = 60  # тиков симуляции в секунду (фиксированный шаг)
+RENDER_RATE = 60  # кадров отрисовки в секунду, не зависит от UPDATE_RATE
+MAX_SIM_STEPS_PER_FRAME = 5  # предел догоняющих тиков за кадр
+RECORD_REPLAYS = True  # записывать ввод каждой сессии (python replay.py для воспроизведения)
+REPLAY_FILE = "replays/last.rpl"
+PROFILE_HISTORY = 600  # кадров в кольцевом буфере профайлера
+PROFILE_DIR = "profiles"
 
 # Параметры игрока
-AVATAR_START_POSITIONS = {
-    0: (1.5, 5),
-    1: (1.5, 1.5),
-    2: (1.5, 1.5)
-}
 AVATAR_SPEED = 3
 AVATAR_SIZE = 20
 AVATAR_MAX_HEALTH = 100
 MOUSE_SENSE = 0.3
 
+# Звуки (звуки не из PRELOAD_SOUNDS грузятся при первом вызове)
+SOUND_FILES = {
+    'shotgun': "resources/sound/shotgun.wav",
+    'enemy_pain': "resources/sound/npc_pain.wav",
+    'enemy_death': "resources/sound/npc_death.wav",
+    'enemy_attack': "resources/sound/npc_attack.wav",
+    'avatar_pain': "resources/sound/player_pain.wav",
+}
+PRELOAD_SOUNDS = ('shotgun', 'enemy_pain', 'enemy_death', 'enemy_attack', 'avatar_pain')
+# Микшер (audio_mixer.py): приоритет при вытеснении, предел одновременных голосов звука, громкость
+SOUND_SETTINGS = {
+    'shotgun': {'priority': 3, 'max_voices': 2, 'volume': 1.0},
+    'avatar_pain': {'priority': 3, 'max_voices': 1, 'volume': 1.0},
+    'enemy_death': {'priority': 2, 'max_voices': 3, 'volume': 0.9},
+    'enemy_attack': {'priority': 1, 'max_voices': 2, 'volume': 0.7},
+    'enemy_pain': {'priority': 1, 'max_voices': 2, 'volume': 0.7},
+}
+AUDIO_MAX_VOICES = 8     # голосов на весь пул (музыка не входит)
+AUDIO_MERGE_GAIN = 0.15  # прибавка громкости за каждое удвоение слитых запросов
+THEME_MUSIC = "resources/sound/theme.mp3"
+
 # Цвета
 GROUND_COLOR = (30, 30, 30)
+CEILING_COLOR = (60, 60, 70)
 MENU_BACKGROUND = (20, 20, 40)
 MENU_TEXT = (255, 255, 255)
 MENU_HIGHLIGHT = (255, 50, 50)
+WALL_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
 
 # Размер клетки карты
 CELL_SIZE = 64
+CHUNK_CELLS = 16        # сторона чанка мира в клетках
+CHUNK_KEEP_MARGIN = 1   # чанков вокруг видимых, геометрия которых не выгружается
+FLOW_FIELD_RADIUS = 32  # клеток от игрока, в которых строится поле потока врагов
 
-# Параметры лучей (не используются в 2D рендере, но оставлены)
-RAY_COUNT = SCR_W // 2
-HALF_RAY_COUNT = RAY_COUNT // 2
-ANGLE_STEP = math.pi / 3 / RAY_COUNT
-RAY_MAX_DEPTH = 20
+# Выстрел: дальность луча и спад урона с расстоянием
+GUN_RANGE = 20 * CELL_SIZE
+GUN_FALLOFF_START = 6 * CELL_SIZE
+GUN_FALLOFF_END = 12 * CELL_SIZE
+GUN_MIN_DAMAGE_FACTOR = 0.5
+
+# Уровни детализации ИИ врагов (ai_scheduler.py)
+AI_LOD_MIN_ENEMIES = 32               # при меньшем числе врагов все обновляются каждый тик
+AI_NEAR_DISTANCE = 8 * CELL_SIZE       # ближе - обновление каждый тик
+AI_VISIBLE_DISTANCE = 20 * CELL_SIZE   # видящие игрока ближе этого - тоже каждый тик
+AI_MID_DISTANCE = 16 * CELL_SIZE       # невидящие ближе этого - средний уровень, дальше - дальний
+AI_TIER_INTERVALS = (1, 3, 8)          # тиков между обновлениями: активный, средний, дальний
+AI_RETIER_INTERVAL = 10                # тиков между переоценками уровней
+AI_LAZY_BUDGET = 64                    # не больше стольких обновлений среднего и дальнего уровня за тик
+AI_MAX_CATCHUP_STEPS = 8               # наибольший множитель шага при догоне пропущенных тиков
+AI_WAKE_TICKS = 120                    # сколько тиков разбуженный враг обновляется каждый тик
+AI_SHOT_NOISE_RADIUS = 10 * CELL_SIZE  # выстрел будит врагов в этом радиусе
 
-# Карты уровней
-MAP_CASTLE = [
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 3, 3, 3, 3, 0, 0, 0, 2, 2, 2, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 2, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 2, 0, 0, 1],
-    [1, 0, 0, 3, 3, 3, 3, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 4, 0, 0, 0, 4, 0, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 3, 1, 3, 1, 1, 1, 3, 0, 0, 3, 1, 1, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 3, 0, 0, 3, 1, 1, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 3, 0, 0, 3, 1, 1, 1],
-    [1, 1, 3, 1, 1, 1, 1, 1, 1, 3, 0, 0, 3, 1, 1, 1],
-    [1, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 2, 0, 0, 0, 0, 0, 3, 4, 0, 4, 3, 0, 1],
-    [1, 0, 0, 5, 0, 0, 0, 0, 0, 0, 3, 0, 3, 0, 0, 1],
-    [1, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 4, 0, 0, 0, 0, 0, 0, 4, 0, 0, 4, 0, 0, 0, 1],
-    [1, 1, 3, 3, 0, 0, 3, 3, 1, 3, 3, 1, 3, 1, 1, 1],
-    [1, 1, 1, 3, 0, 0, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 3, 3, 4, 0, 0, 4, 3, 3, 3, 3, 3, 3, 3, 3, 1],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 0, 0, 5, 0, 0, 0, 5, 0, 0, 0, 5, 0, 0, 0, 3],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3],
-    [3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3],
-]
+# Частицы (particles.py): ёмкость пула и параметры видов эффектов
+PARTICLE_CAPACITY = 8192
+PARTICLE_DRAG = 4.0  # затухание скорости частиц, 1/сек
+PARTICLE_KINDS = {
+    # count - частиц на вызов, life - сек, size/grow - радиус и его прирост в сек, speed - пикс/сек
+    'muzzle_flash': {'count': 1, 'life': 0.3, 'size': 20, 'grow': 100, 'speed': 0, 'color': (255, 255, 200)},
+    'blood': {'count': 12, 'life': 0.5, 'size': 4, 'grow': -4, 'speed': 150, 'color': (170, 0, 0)},
+    'spark': {'count': 8, 'life': 0.25, 'size': 2, 'grow': -4, 'speed': 300, 'color': (255, 210, 90)},
+    'impact': {'count': 1, 'life': 0.2, 'size': 6, 'grow': 40, 'speed': 0, 'color': (190, 190, 190)},
+}
 
-MAP_MAZE = [
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 0, 0, 0, 2, 0, 0, 0, 3, 0, 0, 0, 4, 0, 0, 1],
-    [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1],
-    [1, 0, 3, 0, 0, 0, 2, 0, 0, 0, 4, 0, 0, 0, 5, 1],
-    [1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1],
-    [1, 0, 0, 0, 2, 0, 0, 0, 3, 0, 0, 0, 4, 0, 0, 1],
-    [1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1],
-    [1, 0, 5, 0, 0, 0, 2, 0, 0, 0, 4, 0, 0, 0, 3, 1],
-    [1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1],
-    [1, 0, 2, 0, 0, 0, 3, 0, 0, 0, 4, 0, 0, 0, 5, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-]
+# Кэш предрасчётов (таблицы видимости и т.п.)
+CACHE_DIR = "cache"
+LOS_TABLE_MAX_CELLS = 1024  # больше клеток - видимость считается трассировкой
+NAV_DIR = "resources/nav"   # таблицы следующего шага (собираются python nav_table.py)
+LEVEL_DIR = "levels"        # файлы уровней (формат - level_file.py)
 
-MAP_BASE = [
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 2, 2, 2, 2, 0, 0, 3, 3, 3, 3, 0, 0, 1],
-    [1, 0, 0, 2, 0, 0, 2, 0, 0, 3, 0, 0, 3, 0, 0, 1],
-    [1, 0, 0, 2, 0, 0, 2, 0, 0, 3, 0, 0, 3, 0, 0, 1],
-    [1, 0, 0, 2, 2, 2, 2, 0, 0, 3, 3, 3, 3, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 4, 4, 4, 4, 0, 0, 5, 5, 5, 5, 0, 0, 1],
-    [1, 0, 0, 4, 0, 0, 4, 0, 0, 5, 0, 0, 5, 0, 0, 1],
-    [1, 0, 0, 4, 0, 0, 4, 0, 0, 5, 0, 0, 5, 0, 0, 1],
-    [1, 0, 0, 4, 4, 4, 4, 0, 0, 5, 5, 5, 5, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-]
+# Рекорды (score_store.py)
+SCORE_DB = "high_scores.db"
+LEGACY_SCORES_FILE = "high_scores.csv"  # старая таблица, переносится в пустую базу
+HIGH_SCORE_TOP = 3                      # рекордов на уровень
 
-LEVELS = {0: MAP_CASTLE, 1: MAP_MAZE, 2: MAP_BASE}
\ No newline at end of file
+# Параметры лучей вида от первого лица (raycaster.py, переключение - TAB)
+FOV = math.pi / 3
+HALF_FOV = FOV / 2
+RAY_COUNT = SCR_W // 2
+HALF_RAY_COUNT = RAY_COUNT // 2
+ANGLE_STEP = FOV / RAY_COUNT
+RAY_MAX_DEPTH = 20                 # в клетках
+RAY_IMAGE_HEIGHT = SCR_H // 2      # кадр считается в половинном разрешении и растягивается на GPU
\ No newline at end of file
@@ -0,0 +1,106 @@
+# enemy_sprites.py
+"""Отрисовка врагов и полосок здоровья через постоянные SpriteList.
+
+Спрайты создаются один раз на врага; положение и ширина полоски меняются на месте
+только при изменении, погибшие враги скрываются. Оба списка рисуются через Camera2D,
+так что число вызовов отрисовки не зависит от числа врагов.
+"""
+import arcade
+import numpy as np
+
+BAR_HEIGHT = 4
+BAR_GAP = 5  # от верха врага до полоски
+
+
+class EnemySprites:
+    """Спрайты одного врага: тело, фон и заполнение полоски здоровья."""
+    __slots__ = ('enemy', 'body', 'bar_back', 'bar_fill')
+
+    def __init__(self, enemy):
+        self.enemy = enemy
+        size = enemy.size
+        self.body = arcade.SpriteCircle(max(int(size), 1), enemy.color)
+        self.bar_back = arcade.SpriteSolidColor(int(size * 2), BAR_HEIGHT, color=arcade.color.RED)
+        self.bar_fill = arcade.SpriteSolidColor(int(size * 2), BAR_HEIGHT, color=arcade.color.GREEN)
+
+    def show(self, visible):
+        """Показывает или скрывает все спрайты врага."""
+        self.body.visible = self.bar_back.visible = self.bar_fill.visible = visible
+
+
+class EnemyRenderer:
+    """Все враги уровня в двух SpriteList: тела и полоски здоровья."""
+    def __init__(self, entity_controller):
+        self.entity_controller = entity_controller
+        self.bodies = arcade.SpriteList()
+        self.bars = arcade.SpriteList()
+        self.entries = []  # EnemySprites в порядке enemy_list
+        # что сейчас записано в спрайты (NaN - ещё ничего)
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.hp = np.zeros(0)
+        self.shown = np.zeros(0, dtype=bool)
+        self.camera = arcade.Camera2D()
+
+    def sync(self):
+        """Заводит спрайты для врагов, добавленных с прошлого кадра."""
+        enemies = self.entity_controller.enemy_list
+        added = len(enemies) - len(self.entries)
+        if added <= 0:
+            return
+        for enemy in enemies[len(self.entries):]:
+            entry = EnemySprites(enemy)
+            entry.show(False)
+            self.bodies.append(entry.body)
+            self.bars.append(entry.bar_back)
+            self.bars.append(entry.bar_fill)
+            self.entries.append(entry)
+        self.x = np.concatenate([self.x, np.full(added, np.nan)])
+        self.y = np.concatenate([self.y, np.full(added, np.nan)])
+        self.hp = np.concatenate([self.hp, np.full(added, np.nan)])
+        self.shown = np.concatenate([self.shown, np.zeros(added, dtype=bool)])
+
+    def current_state(self, alpha):
+        """Положения между тиками, здоровье и признак жизни всех врагов массивами."""
+        swarm = self.entity_controller.swarm
+        n = len(self.entries)
+        if swarm is not None:
+            prev_x, prev_y = swarm.prev_x[:n], swarm.prev_y[:n]
+            return (prev_x + (swarm.x[:n] - prev_x) * alpha, prev_y + (swarm.y[:n] - prev_y) * alpha,
+                    swarm.hp[:n].copy(), swarm.alive[:n].copy())
+        enemies = [entry.enemy for entry in self.entries]
+        positions = np.array([enemy.render_position(alpha) for enemy in enemies], dtype=np.float64).reshape(n, 2)
+        return (positions[:, 0], positions[:, 1], np.array([enemy.hp for enemy in enemies], dtype=np.float64),
+                np.array([enemy.is_alive for enemy in enemies], dtype=bool))
+
+    def update(self, alpha):
+        """Переносит в спрайты только изменившиеся положения и здоровье; погибших скрывает."""
+        x, y, hp, alive = self.current_state(alpha)
+        for k in np.flatnonzero(self.shown & ~alive):
+            self.entries[k].show(False)
+        moved = alive & ((x != self.x) | (y != self.y) | ~self.shown)
+        hurt = alive & (hp != self.hp)
+        changed = np.flatnonzero(moved | hurt)
+        for k, ex, ey, ehp, is_hurt, was_shown in zip(changed.tolist(), x[changed].tolist(), y[changed].tolist(),
+                                                      hp[changed].tolist(), hurt[changed].tolist(),
+                                                      self.shown[changed].tolist()):
+            entry = self.entries[k]
+            size = entry.enemy.size
+            if is_hurt:
+                entry.bar_fill.width = max(size * 2 * ehp / 100, 0)
+            bar_y = ey + size + BAR_GAP + BAR_HEIGHT / 2
+            entry.body.position = (ex, ey)
+            entry.bar_back.position = (ex, bar_y)
+            entry.bar_fill.position = (ex - size + entry.bar_fill.width / 2, bar_y)
+            if not was_shown:
+                entry.show(True)
+        self.x, self.y, self.hp, self.shown = x, y, hp, alive
+
+    def draw(self, camera_x, camera_y, alpha=1.0):
+        """Отрисовка всех врагов двумя вызовами с камерой в точке (camera_x, camera_y)."""
+        self.sync()
+        self.update(alpha)
+        self.camera.position = (camera_x, camera_y)
+        with self.camera.activate():
+            self.bodies.draw()
+            self.bars.draw()
\ No newline at end of file
@@ -0,0 +1,288 @@
+# enemy_swarm.py
+import numpy as np
+import collision
+import constants as const
+from enemies import EnemyBase
+from path_solver import NO_DIRECTION
+
+ATTACK_ROLL_CHANCE = 0.01  # вероятность попытки атаки за тик (как в EnemyBase.attempt_attack)
+# сдвиги клеток окрестности 3x3 для проверки столкновений
+NEAR_DX = np.array([-1, -1, -1, 0, 0, 0, 1, 1, 1])
+NEAR_DY = np.array([-1, 0, 1, -1, 0, 1, -1, 0, 1])
+
+
+def _array_property(name, cast):
+    """Свойство представления, читающее и пишущее элемент массива роя."""
+    def getter(self):
+        return cast(getattr(self.swarm, name)[self.index])
+
+    def setter(self, value):
+        getattr(self.swarm, name)[self.index] = value
+    return property(getter, setter)
+
+
+class EnemyView:
+    """Один враг роя: доступ к его элементам массивов для отрисовки и урона."""
+    __slots__ = ('swarm', 'index', 'color')
+
+    def __init__(self, swarm, index, color):
+        self.swarm = swarm
+        self.index = index
+        self.color = color
+
+    x = _array_property('x', float)
+    y = _array_property('y', float)
+    prev_x = _array_property('prev_x', float)
+    prev_y = _array_property('prev_y', float)
+    hp = _array_property('hp', float)
+    size = _array_property('size', float)
+    damage = _array_property('damage', float)
+    move_speed = _array_property('speed', float)
+    attack_range = _array_property('attack_range', float)
+    hit_chance = _array_property('hit_chance', float)
+    is_alive = _array_property('alive', bool)
+    is_hurt = _array_property('hurt', bool)
+    current_image = _array_property('current_image', int)
+
+    @property
+    def simulation(self):
+        return self.swarm.simulation
+
+    def can_step_to(self, new_x, new_y):
+        """Проверка возможности перемещения в точку (та же, что в векторном шаге)."""
+        ok = self.swarm.can_step_to(np.array([self.index]), np.array([new_x]), np.array([new_y]))
+        return bool(ok[0])
+
+    render_position = EnemyBase.render_position
+    take_damage = EnemyBase.take_damage
+
+
+class EnemySwarm:
+    """Состояние всех врагов в массивах NumPy и пакетная обработка их ИИ."""
+    def __init__(self, simulation, capacity=64):
+        self.simulation = simulation
+        self.np_rng = np.random.default_rng(simulation.rng.getrandbits(64))
+        self.count = 0
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.hp = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.damage = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.attack_range = np.zeros(capacity)
+        self.hit_chance = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.hurt = np.zeros(capacity, dtype=bool)
+        self.anim_time = np.zeros(capacity)
+        self.anim_prev = np.zeros(capacity)
+        self.current_image = np.zeros(capacity, dtype=np.int8)
+        self.views = []
+        # живые враги по клеткам карты: односвязные списки номеров, меняются при перемещении
+        rows, cols = simulation.level.walls.shape
+        self.cell_head = np.full(rows * cols, -1, dtype=np.int32)  # клетка -> первый враг в ней
+        self.cell_next = np.full(capacity, -1, dtype=np.int64)     # враг -> следующий в той же клетке
+        self.cell_of = np.full(capacity, -1, dtype=np.int64)       # враг -> его клетка (-1 - нет в списках)
+
+    def grow(self):
+        """Удваивает ёмкость массивов."""
+        self.capacity *= 2
+        for name in ('x', 'y', 'prev_x', 'prev_y', 'hp', 'size', 'damage', 'speed', 'attack_range',
+                     'hit_chance', 'alive', 'hurt', 'anim_time', 'anim_prev', 'current_image',
+                     'cell_next', 'cell_of'):
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, enemy):
+        """Переносит параметры созданного врага в массивы и возвращает его представление."""
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        self.x[i] = enemy.x
+        self.y[i] = enemy.y
+        self.prev_x[i] = enemy.x
+        self.prev_y[i] = enemy.y
+        self.hp[i] = enemy.hp
+        self.size[i] = enemy.size
+        self.damage[i] = enemy.damage
+        self.speed[i] = enemy.move_speed
+        self.attack_range[i] = enemy.attack_range
+        self.hit_chance[i] = enemy.hit_chance
+        self.alive[i] = enemy.is_alive
+        self.anim_time[i] = enemy.animation_time
+        self.count += 1
+        self.cell_of[i] = -1
+        if enemy.is_alive:
+            self.relink(np.array([i]))
+        view = EnemyView(self, i, enemy.color)
+        self.views.append(view)
+        return view
+
+    def alive_indices(self):
+        """Индексы живых врагов."""
+        return np.flatnonzero(self.alive[:self.count])
+
+    def cell_coords(self, x, y):
+        """Клетки карты для точек (прижатые к границам карты)."""
+        rows, cols = self.simulation.level.walls.shape
+        cx = np.clip(np.floor(x / const.CELL_SIZE).astype(np.int64), 0, cols - 1)
+        cy = np.clip(np.floor(y / const.CELL_SIZE).astype(np.int64), 0, rows - 1)
+        return cx, cy
+
+    def link(self, i, key):
+        """Добавляет врага i в список клетки key."""
+        self.cell_of[i] = key
+        self.cell_next[i] = self.cell_head[key]
+        self.cell_head[key] = i
+
+    def unlink(self, i):
+        """Убирает врага i из списка его клетки (если он там есть)."""
+        key = self.cell_of[i]
+        if key < 0:
+            return
+        prev, cur = -1, self.cell_head[key]
+        while cur != i:
+            prev, cur = cur, self.cell_next[cur]
+        if prev < 0:
+            self.cell_head[key] = self.cell_next[i]
+        else:
+            self.cell_next[prev] = self.cell_next[i]
+        self.cell_of[i] = -1
+
+    def relink(self, idx):
+        """Переносит врагов idx, сменивших клетку, в списки новых клеток."""
+        if not idx.size:
+            return
+        cols = self.simulation.level.walls.shape[1]
+        cx, cy = self.cell_coords(self.x[idx], self.y[idx])
+        keys = cy * cols + cx
+        changed = keys != self.cell_of[idx]
+        for i, key in zip(idx[changed].tolist(), keys[changed].tolist()):
+            self.unlink(i)
+            self.link(i, key)
+
+    def blocked_by_enemies(self, idx, nx, ny):
+        """Пересечение кругов с другими живыми врагами по спискам клеток 3x3 вокруг каждой точки."""
+        rows, cols = self.simulation.level.walls.shape
+        blocked = np.zeros(idx.size, dtype=bool)
+        qcx, qcy = self.cell_coords(nx, ny)
+        cx = (qcx[:, None] + NEAR_DX).ravel()
+        cy = (qcy[:, None] + NEAR_DY).ravel()
+        valid = (cx >= 0) & (cx < cols) & (cy >= 0) & (cy < rows)
+        query = np.repeat(np.arange(idx.size), NEAR_DX.size)[valid]
+        other = self.cell_head[cy[valid] * cols + cx[valid]].astype(np.int64)
+        # все пары (точка, враг из соседней клетки) идут по спискам одновременно
+        while True:
+            present = other >= 0
+            if not present.all():
+                query, other = query[present], other[present]
+            if not other.size:
+                return blocked
+            dx = nx[query] - self.x[other]
+            dy = ny[query] - self.y[other]
+            reach = self.size[idx[query]] + self.size[other]
+            hit = (dx * dx + dy * dy < reach * reach) & (other != idx[query])
+            blocked[query[hit]] = True
+            other = self.cell_next[other]
+
+    def can_step_to(self, idx, nx, ny):
+        """Пакетная проверка перемещения врагов idx в точки (nx, ny)."""
+        r = self.size[idx]
+        avatar = self.simulation.avatar
+        blocked = collision.circles_hit_walls(self.simulation.level, nx, ny, r)
+        blocked |= (nx - avatar.x) ** 2 + (ny - avatar.y) ** 2 < (r + const.AVATAR_SIZE) ** 2
+        blocked |= self.blocked_by_enemies(idx, nx, ny)
+        return ~blocked
+
+    def store_previous_positions(self):
+        """Копирует текущие координаты в prev_x, prev_y перед тиком."""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def update_frames(self, idx, delta_time, steps=1):
+        """Таймеры анимации врагов idx (steps - догоняемые тики каждого)."""
+        self.anim_prev[idx] += delta_time * 1000 * steps
+        wrap = idx[self.anim_prev[idx] > self.anim_time[idx]]
+        self.anim_prev[wrap] = 0
+        self.current_image[wrap] = (self.current_image[wrap] + 1) % 4
+
+    def flow_targets(self, idx):
+        """Центры следующих клеток поля потока для врагов idx и маска, где путь есть."""
+        solver = self.simulation.path_solver
+        half = const.CELL_SIZE / 2
+        ci = np.clip(np.floor((self.x[idx] + half) / const.CELL_SIZE).astype(np.int64), 0, solver.cols - 1)
+        cj = np.clip(np.floor((self.y[idx] + half) / const.CELL_SIZE).astype(np.int64), 0, solver.rows - 1)
+        direction = np.frombuffer(solver.flow_field, dtype=np.uint8)[cj * solver.cols + ci]
+        has_path = direction != NO_DIRECTION
+        ways = np.array(solver.ways + [(0, 0)], dtype=np.int64)
+        step = ways[np.minimum(direction, len(solver.ways))]
+        return (ci + step[:, 0]) * const.CELL_SIZE, (cj + step[:, 1]) * const.CELL_SIZE, has_path
+
+    def move_to_avatar(self, idx, steps=1):
+        """Шаг к игроку: напрямую к видимому, иначе по полю потока (скольжение по осям); steps - множитель шага."""
+        avatar = self.simulation.avatar
+        x = self.x[idx]
+        y = self.y[idx]
+        goal_x = np.full(idx.size, float(avatar.x))
+        goal_y = np.full(idx.size, float(avatar.y))
+        visible = self.simulation.level.has_line_of_sight_many(avatar.x, avatar.y, x, y)
+        flow_x, flow_y, has_path = self.flow_targets(idx)
+        follow = ~visible & has_path
+        goal_x[follow] = flow_x[follow]
+        goal_y[follow] = flow_y[follow]
+        dx = goal_x - x
+        dy = goal_y - y
+        distance = np.hypot(dx, dy)
+        moving = (distance > 0) & ((distance > self.attack_range[idx]) | ~visible)
+        m = idx[moving]
+        if not m.size:
+            return
+        step = self.speed[m] * (steps[moving] if np.ndim(steps) else steps) / distance[moving]
+        collision.move_and_slide_many(self.x, self.y, m, dx[moving] * step, dy[moving] * step,
+                                      self.size[m], self.can_step_to, self.relink)
+
+    def attempt_attacks(self, idx):
+        """Броски атаки и попадания пакетом; видимость проверяется только для попавших."""
+        sim = self.simulation
+        avatar = sim.avatar
+        distance = np.hypot(avatar.x - self.x[idx], avatar.y - self.y[idx])
+        rolls = self.np_rng.random((2, idx.size))
+        hits = idx[(distance < self.attack_range[idx]) & (rolls[0] < ATTACK_ROLL_CHANCE)
+                   & (rolls[1] < self.hit_chance[idx])]
+        for i in hits:
+            if sim.state != "PLAYING":
+                break
+            if sim.check_visibility(avatar.x, avatar.y, self.x[i], self.y[i], sim.level.world_map):
+                avatar.apply_damage(int(self.damage[i]), self.views[i])
+
+    def update(self, delta_time, idx=None, steps=1):
+        """Один тик ИИ для живых врагов idx (по умолчанию - всех)."""
+        if idx is None:
+            idx = self.alive_indices()
+        if not idx.size:
+            return
+        self.update_frames(idx, delta_time, steps)
+        self.move_to_avatar(idx, steps)
+        self.attempt_attacks(idx)
+
+    def views_at(self, idx):
+        """Представления врагов по массиву индексов."""
+        views = self.views
+        return [views[i] for i in idx]
+
+    def views_near(self, x, y, reach):
+        """Живые враги в квадрате со стороной 2*reach вокруг точки."""
+        n = self.count
+        mask = self.alive[:n] & (np.abs(self.x[:n] - x) <= reach) & (np.abs(self.y[:n] - y) <= reach)
+        return self.views_at(np.flatnonzero(mask))
+
+    def views_in_radius(self, x, y, radius):
+        """Живые враги, центры которых в радиусе radius."""
+        n = self.count
+        mask = self.alive[:n] & ((self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2 <= radius * radius)
+        return self.views_at(np.flatnonzero(mask))
\ No newline at end of file
@@ -1,101 +1,151 @@
 # entity_controller.py
-import arcade
-from enemies import SoldierEnemy, CacoDemonEnemy, CyberDemonEnemy
+import math
+from enemies import ENEMY_TYPES
 from visual_base import AnimatedVisual
+from spatial_grid import SpatialGrid
+from enemy_swarm import EnemySwarm
+from particles import ParticleSystem
+from enemy_sprites import EnemyRenderer
+from ai_scheduler import AIScheduler
+from events import EnemySpawned, EnemyDamaged, EnemyKilled, ShotFired
 import constants as const
 
 
 class EntityController:
     """Управление всеми сущностями на уровне (враги, спрайты, эффекты)."""
-    def __init__(self, main_game, level_id=0):
-        self.main_game = main_game
+    def __init__(self, simulation, level_id=0, vectorized=False):
+        self.simulation = simulation
         self.level_id = level_id
+        # при vectorized враги хранятся в массивах роя, а enemy_list содержит их представления
+        self.swarm = EnemySwarm(simulation) if vectorized else None
         self.visual_list = []  # список декоративных спрайтов
         self.enemy_list = []   # список врагов
-        self.shot_effects = [] # вспышки выстрелов
-        self.fixed_enemy_positions = self.get_fixed_enemy_positions()
-        self.spawn_fixed_enemies()
+        self.particles = ParticleSystem(seed=simulation.seed)  # вспышки, кровь, искры
+        self.enemy_renderer = None  # SpriteList врагов, создаётся при первой отрисовке
+        self.spatial_grid = SpatialGrid()  # живые враги по клеткам
+        self.max_enemy_size = 0
+        self.ai_scheduler = AIScheduler(self)  # кого из врагов обновлять в каждом тике
+        events = simulation.events
+        events.subscribe(EnemyDamaged, self.enemy_hurt)
+        events.subscribe(EnemyKilled, self.enemy_died)
+        events.subscribe(ShotFired, self.shot_fired)
+        self.spawn_level_enemies()
         self.setup_visuals()
 
-    def get_fixed_enemy_positions(self):
-        """Возвращает список фиксированных позиций врагов для данного уровня."""
-        if self.level_id == 0:
-            return [
-                {'type': SoldierEnemy, 'pos': (3.5, 3.5)},
-                {'type': SoldierEnemy, 'pos': (12.5, 5.5)},
-                {'type': CacoDemonEnemy, 'pos': (8.5, 8.5)},
-                {'type': SoldierEnemy, 'pos': (5.5, 12.5)},
-                {'type': CyberDemonEnemy, 'pos': (14.5, 14.5)}
-            ]
-        elif self.level_id == 1:
-            return [
-                {'type': SoldierEnemy, 'pos': (3.5, 2.5)},
-                {'type': SoldierEnemy, 'pos': (12.5, 2.5)},
-                {'type': CacoDemonEnemy, 'pos': (7.5, 7.5)},
-                {'type': SoldierEnemy, 'pos': (2.5, 12.5)},
-                {'type': CyberDemonEnemy, 'pos': (12.5, 12.5)}
-            ]
-        elif self.level_id == 2:
-            return [
-                {'type': SoldierEnemy, 'pos': (4.5, 4.5)},
-                {'type': SoldierEnemy, 'pos': (11.5, 4.5)},
-                {'type': CacoDemonEnemy, 'pos': (4.5, 11.5)},
-                {'type': SoldierEnemy, 'pos': (11.5, 11.5)},
-                {'type': CyberDemonEnemy, 'pos': (8.5, 8.5)}
-            ]
-        return []
-
-    def spawn_fixed_enemies(self):
-        """Создаёт врагов в фиксированных позициях."""
-        for data in self.fixed_enemy_positions:
-            enemy_type = data['type']
-            pos = data['pos']
-            self.add_enemy(enemy_type(self.main_game, pos))
+    def spawn_level_enemies(self):
+        """Создаёт врагов в позициях из файла уровня."""
+        for code, x, y in self.simulation.level.enemy_spawns:
+            self.add_enemy(ENEMY_TYPES[code](self.simulation, (x, y)))
 
     def setup_visuals(self):
         """Настройка декоративных спрайтов (пусто)."""
         pass
 
-    def check_victory(self):
-        """Проверка условия победы (все враги мертвы)."""
-        alive_enemies = [e for e in self.enemy_list if e.is_alive]
-        if not alive_enemies and self.main_game.state == "PLAYING":
-            self.main_game.state = "WIN"
+    def alive_count(self):
+        """Число живых врагов (ведётся по событиям в GameStats)."""
+        return self.simulation.stats.alive
 
     def add_muzzle_flash(self, x, y):
-        """Добавляет эффект вспышки выстрела."""
-        self.shot_effects.append({'x': x, 'y': y, 'size': 20, 'alpha': 255, 'life': 0.3})
+        """Добавляет эффект вспышки выстрела (мировые координаты)."""
+        self.particles.emit('muzzle_flash', x, y)
+
+    def add_hit_effect(self, hit, x, y, angle):
+        """Кровь при попадании во врага или искры у стены в конце луча выстрела из (x, y)."""
+        if hit.enemy is not None:
+            distance, kind = hit.distance, 'blood'
+        elif hit.wall_distance < const.GUN_RANGE:
+            distance, kind = hit.wall_distance, 'spark'
+        else:
+            return
+        px = x + math.cos(angle) * distance
+        py = y + math.sin(angle) * distance
+        # брызги летят навстречу стрелку
+        self.particles.emit(kind, px, py, angle + math.pi, math.pi / 3)
+        if kind == 'spark':
+            self.particles.emit('impact', px, py)
 
     def update_all(self, delta_time):
         """Обновляет все сущности."""
+        profiler = self.simulation.profiler
         for visual in self.visual_list:
             if isinstance(visual, AnimatedVisual):
                 visual.update_frame(delta_time)
-        for enemy in self.enemy_list:
-            enemy.process_ai(delta_time)
-        for effect in self.shot_effects[:]:
-            effect['life'] -= delta_time
-            effect['size'] += 100 * delta_time
-            effect['alpha'] = int(255 * (effect['life'] / 0.3))
-            if effect['life'] <= 0:
-                self.shot_effects.remove(effect)
-        self.check_victory()
-
-    def draw_all(self):
-        """Отрисовка всех сущностей."""
-        for effect in self.shot_effects:
-            arcade.draw_circle_filled(
-                effect['x'],
-                effect['y'],
-                effect['size'],
-                (255, 255, 200, effect['alpha'])
-            )
+        with profiler.section('ai'):
+            idx, steps = self.ai_scheduler.due()
+            if self.swarm is not None:
+                self.swarm.update(delta_time, idx, steps)
+            else:
+                enemies = self.enemy_list
+                for k, enemy_steps in zip(idx.tolist(), steps.tolist()):
+                    enemies[k].process_ai(delta_time, enemy_steps)
+        with profiler.section('effects'):
+            self.particles.update(delta_time)
+        with profiler.section('victory'):
+            self.simulation.stats.check_victory()
+
+    def store_previous_positions(self):
+        """Запоминает положения врагов перед тиком (для интерполяции при отрисовке)."""
+        if self.swarm is not None:
+            self.swarm.store_previous_positions()
+            return
         for enemy in self.enemy_list:
             if enemy.is_alive:
-                enemy.draw()
+                enemy.prev_x, enemy.prev_y = enemy.x, enemy.y
+
+    def draw_all(self, camera_x, camera_y, alpha=1.0):
+        """Отрисовка всех сущностей относительно камеры; alpha - доля времени до следующего тика."""
+        self.particles.draw(camera_x, camera_y)
+        if self.enemy_renderer is None:
+            self.enemy_renderer = EnemyRenderer(self)
+        self.enemy_renderer.draw(camera_x, camera_y, alpha)
 
     def add_enemy(self, enemy):
+        if self.swarm is not None:
+            enemy = self.swarm.add(enemy)
+        elif enemy.is_alive:
+            self.spatial_grid.insert(enemy)
         self.enemy_list.append(enemy)
+        self.ai_scheduler.add(enemy)
+        self.max_enemy_size = max(self.max_enemy_size, enemy.size)
+        self.simulation.events.publish(EnemySpawned(enemy))
+
+    def enemy_moved(self, enemy):
+        """Обновляет положение врага в пространственной сетке."""
+        self.spatial_grid.move(enemy)
+
+    def enemy_hurt(self, event):
+        """Раненый враг сразу переходит на ежетиковое обновление ИИ."""
+        self.ai_scheduler.wake(event.enemy)
+
+    def shot_fired(self, event):
+        """Вспышка и след выстрела; шум будит врагов рядом со стрелком."""
+        self.add_muzzle_flash(event.x, event.y)
+        self.wake_enemies_near(event.x, event.y, const.AI_SHOT_NOISE_RADIUS)
+        self.add_hit_effect(event.hit, event.x, event.y, event.angle)
+
+    def wake_enemies_near(self, x, y, radius):
+        """Будит ИИ живых врагов в радиусе (шум выстрела)."""
+        for enemy in self.enemies_in_radius(x, y, radius):
+            self.ai_scheduler.wake(enemy)
+
+    def enemy_died(self, event):
+        """Убирает погибшего врага из пространственной сетки и расписания ИИ."""
+        self.spatial_grid.remove(event.enemy)
+        self.ai_scheduler.died(event.enemy)
+        if self.swarm is not None:
+            self.swarm.unlink(event.enemy.index)
+
+    def enemies_near(self, x, y, radius):
+        """Кандидаты на столкновение с кругом радиуса radius (с учётом размера врагов)."""
+        if self.swarm is not None:
+            return self.swarm.views_near(x, y, radius + self.max_enemy_size)
+        return self.spatial_grid.nearby(x, y, radius + self.max_enemy_size)
+
+    def enemies_in_radius(self, x, y, radius):
+        """Живые враги, центры которых в радиусе radius (близость, урон по площади)."""
+        if self.swarm is not None:
+            return self.swarm.views_in_radius(x, y, radius)
+        return self.spatial_grid.query_radius(x, y, radius)
 
     def add_visual(self, visual):
         self.visual_list.append(visual)
\ No newline at end of file
@@ -0,0 +1,131 @@
+# events.py
+"""Шина событий симуляции и итоги матча, которые ведутся по событиям.
+
+Урон, гибель врагов и выстрелы публикуются один раз в момент, когда происходят;
+счётчики убийств и живых врагов, победа, поражение, звуки и статистика обновляются
+подписчиками. Тик больше не пересчитывает их обходом всех врагов: работа
+пропорциональна числу событий, а не числу врагов.
+"""
+
+
+class EnemySpawned:
+    """Враг добавлен на уровень."""
+    __slots__ = ('enemy',)
+
+    def __init__(self, enemy):
+        self.enemy = enemy
+
+
+class EnemyDamaged:
+    """Враг получил урон (публикуется до EnemyKilled, если урон смертельный)."""
+    __slots__ = ('enemy', 'amount')
+
+    def __init__(self, enemy, amount):
+        self.enemy = enemy
+        self.amount = amount
+
+
+class EnemyKilled:
+    """Враг погиб."""
+    __slots__ = ('enemy',)
+
+    def __init__(self, enemy):
+        self.enemy = enemy
+
+
+class AvatarDamaged:
+    """Игрок получил урон; source - атаковавший враг или None."""
+    __slots__ = ('amount', 'source')
+
+    def __init__(self, amount, source=None):
+        self.amount = amount
+        self.source = source
+
+
+class ShotFired:
+    """Выстрел игрока из (x, y) по направлению angle; hit - результат hitscan.cast."""
+    __slots__ = ('x', 'y', 'angle', 'hit')
+
+    def __init__(self, x, y, angle, hit):
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.hit = hit
+
+
+class EventBus:
+    """Синхронная шина: обработчики вызываются сразу при публикации в порядке подписки."""
+    def __init__(self):
+        self.handlers = {}  # тип события -> список обработчиков
+
+    def subscribe(self, event_type, handler):
+        """Подписывает обработчик на события типа event_type."""
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def publish(self, event):
+        """Передаёт событие всем подписчикам его типа."""
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
+
+
+class GameStats:
+    """Итоги матча: живые враги, убийства, выстрелы и урон, а также победа и поражение."""
+    def __init__(self, simulation, bus):
+        self.simulation = simulation
+        self.enemies = 0       # всего врагов на уровне
+        self.alive = 0         # живых врагов
+        self.kills = 0
+        self.shots_fired = 0
+        self.shots_hit = 0
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        bus.subscribe(EnemySpawned, self.enemy_spawned)
+        bus.subscribe(EnemyDamaged, self.enemy_damaged)
+        bus.subscribe(EnemyKilled, self.enemy_killed)
+        bus.subscribe(AvatarDamaged, self.avatar_damaged)
+        bus.subscribe(ShotFired, self.shot_fired)
+
+    def enemy_spawned(self, event):
+        """Новый враг на уровне."""
+        self.enemies += 1
+        if event.enemy.is_alive:
+            self.alive += 1
+
+    def enemy_damaged(self, event):
+        """Урон по врагам."""
+        self.damage_dealt += event.amount
+
+    def enemy_killed(self, event):
+        """Убийство врага."""
+        self.kills += 1
+        self.alive -= 1
+
+    def check_victory(self):
+        """Победа, когда живых врагов не осталось (проверка по счётчику, без обхода врагов)."""
+        if not self.alive and self.simulation.state == "PLAYING":
+            self.simulation.state = "WIN"
+
+    def avatar_damaged(self, event):
+        """Здоровье игрока ниже 1 - поражение."""
+        self.damage_taken += event.amount
+        if self.simulation.avatar.hp < 1:
+            self.simulation.state = "GAME_OVER"
+
+    def shot_fired(self, event):
+        """Выстрелы и попадания."""
+        self.shots_fired += 1
+        if event.hit.enemy is not None:
+            self.shots_hit += 1
+
+
+def connect_sounds(bus, play_sound):
+    """Подписывает звуки игры на события; play_sound вызывается с именем звука."""
+    bus.subscribe(ShotFired, lambda event: play_sound('shotgun'))
+    bus.subscribe(EnemyDamaged, lambda event: play_sound('enemy_pain'))
+    bus.subscribe(EnemyKilled, lambda event: play_sound('enemy_death'))
+
+    def avatar_damaged(event):
+        play_sound('avatar_pain')
+        if event.source is not None:
+            play_sound('enemy_attack')
+    bus.subscribe(AvatarDamaged, avatar_damaged)
\ No newline at end of file
@@ -1,21 +1,179 @@
 # game_level.py
+import numpy as np
 import constants as const
+import level_file
+import line_of_sight
+
+
+class WorldMap:
+    """Стены как отображение (i, j) -> id текстуры поверх плотной сетки (без словаря на каждую стену)."""
+    def __init__(self, grid):
+        self.grid = grid  # массив uint8 [j, i], 0 - пусто
+        self.rows, self.cols = grid.shape
+
+    def get(self, key, default=None):
+        i, j = key
+        if 0 <= i < self.cols and 0 <= j < self.rows:
+            value = int(self.grid[j, i])
+            if value:
+                return value
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __len__(self):
+        return int(np.count_nonzero(self.grid))
+
+    def __iter__(self):
+        ys, xs = np.nonzero(self.grid)
+        return zip(xs.tolist(), ys.tolist())
+
+    def items(self):
+        ys, xs = np.nonzero(self.grid)
+        return zip(zip(xs.tolist(), ys.tolist()), self.grid[ys, xs].tolist())
 
 
 class GameLevel:
     """Уровень игры, содержит карту и список стен."""
-    def __init__(self, main_game, level_id=0):
-        self.main_game = main_game
+    def __init__(self, simulation, level_id=0, mini_map=None):
+        self.simulation = simulation
         self.level_id = level_id
-        self.mini_map = const.LEVELS[level_id]
-        self.world_map = {}  # словарь (x, y) -> id текстуры
+        # без явной карты уровень читается из файла вместе с точками появления
+        self.level_data = level_file.load_level(level_id) if mini_map is None else None
+        self.mini_map = mini_map if mini_map is not None else self.level_data.mini_map
+        self.spawn = self.level_data.spawn if self.level_data is not None else (1.5, 5)
+        self.enemy_spawns = self.level_data.enemies if self.level_data is not None else []
         self.rows = len(self.mini_map)
         self.cols = len(self.mini_map[0])
+        self.grid = None       # id текстур [j, i]
+        self.world_map = None  # то же как отображение (x, y) -> id текстуры
+        # плотная сетка занятости: occupancy[j * cols + i] == 1 для стены, walls - её вид NumPy [j, i]
+        self.occupancy = None
+        self.walls = None
         self.build_world()
+        self.los_index = None  # клетка (j * cols + i) -> строка таблицы
+        self.los_bits = None
+        self.los_stride = 0
+        self.los_table = None        # та же таблица как массив NumPy (для пакетных запросов)
+        self.los_index_array = None
+        self.build_visibility()
 
     def build_world(self):
-        """Заполняет world_map на основе mini_map."""
-        for j, row in enumerate(self.mini_map):
-            for i, value in enumerate(row):
-                if value:
-                    self.world_map[(i, j)] = value
\ No newline at end of file
+        """Строит сетку текстур, world_map и сетку занятости по mini_map."""
+        if self.level_data is not None:
+            grid = np.frombuffer(self.level_data.grid, dtype=np.uint8).reshape(self.rows, self.cols)
+        else:
+            grid = np.array(self.mini_map, dtype=np.uint8)
+        self.grid = grid
+        self.world_map = WorldMap(grid)
+        self.occupancy = bytearray((grid != 0).tobytes())
+        self.walls = np.frombuffer(self.occupancy, dtype=np.bool_).reshape(self.rows, self.cols)
+
+    def chunk_range(self, left, bottom, right, top):
+        """Диапазоны номеров чанков, задевающих прямоугольник в мировых координатах."""
+        span = const.CHUNK_CELLS * const.CELL_SIZE
+        half = const.CELL_SIZE / 2
+        max_ci = (self.cols - 1) // const.CHUNK_CELLS
+        max_cj = (self.rows - 1) // const.CHUNK_CELLS
+        ci0 = max(int((left + half) // span), 0)
+        ci1 = min(int((right + half) // span), max_ci)
+        cj0 = max(int((bottom + half) // span), 0)
+        cj1 = min(int((top + half) // span), max_cj)
+        return range(ci0, ci1 + 1), range(cj0, cj1 + 1)
+
+    def chunk_walls(self, ci, cj):
+        """Стены чанка (ci, cj): список (i, j, id текстуры)."""
+        n = const.CHUNK_CELLS
+        block = self.grid[cj * n:(cj + 1) * n, ci * n:(ci + 1) * n]
+        ys, xs = np.nonzero(block)
+        return list(zip((xs + ci * n).tolist(), (ys + cj * n).tolist(), block[ys, xs].tolist()))
+
+    def is_wall(self, i, j):
+        """Стена в клетке (i, j); клетки за краем карты считаются свободными."""
+        return 0 <= i < self.cols and 0 <= j < self.rows and self.occupancy[j * self.cols + i] == 1
+
+    def build_visibility(self):
+        """Загружает или считает упакованную таблицу прямой видимости между клетками."""
+        xs, ys, table = line_of_sight.load_or_build(self.walls)
+        if table is None:
+            return
+        self.los_index = [-1] * (self.rows * self.cols)
+        for k, (i, j) in enumerate(zip(xs.tolist(), ys.tolist())):
+            self.los_index[j * self.cols + i] = k
+        self.los_bits = table.tobytes()
+        self.los_stride = table.shape[1]
+        self.los_table = table
+        self.los_index_array = np.array(self.los_index, dtype=np.int32)
+
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Прямая видимость между точками по клеткам: бит таблицы или трассировка."""
+        i1 = int(x1 // const.CELL_SIZE)
+        j1 = int(y1 // const.CELL_SIZE)
+        i2 = int(x2 // const.CELL_SIZE)
+        j2 = int(y2 // const.CELL_SIZE)
+        if self.los_bits is not None:
+            cols = self.cols
+            if 0 <= i1 < cols and 0 <= i2 < cols and 0 <= j1 < self.rows and 0 <= j2 < self.rows:
+                a = self.los_index[j1 * cols + i1]
+                b = self.los_index[j2 * cols + i2]
+                if a >= 0 and b >= 0:
+                    return bool(self.los_bits[a * self.los_stride + (b >> 3)] & (0x80 >> (b & 7)))
+        return self.trace_line_of_sight(i1, j1, i2, j2)
+
+    def has_line_of_sight_many(self, x1, y1, xs, ys):
+        """Видимость из точки (x1, y1) до массива точек (xs, ys); результат - массив bool."""
+        i1 = int(x1 // const.CELL_SIZE)
+        j1 = int(y1 // const.CELL_SIZE)
+        i2 = np.floor(xs / const.CELL_SIZE).astype(np.int64)
+        j2 = np.floor(ys / const.CELL_SIZE).astype(np.int64)
+        result = np.zeros(i2.size, dtype=bool)
+        rest = np.ones(i2.size, dtype=bool)
+        if self.los_table is not None and 0 <= i1 < self.cols and 0 <= j1 < self.rows:
+            a = self.los_index[j1 * self.cols + i1]
+            inside = (i2 >= 0) & (i2 < self.cols) & (j2 >= 0) & (j2 < self.rows)
+            b = np.full(i2.size, -1, dtype=np.int64)
+            b[inside] = self.los_index_array[j2[inside] * self.cols + i2[inside]]
+            known = (b >= 0) & (a >= 0)
+            bk = b[known]
+            result[known] = (self.los_table[a, bk >> 3] >> (7 - (bk & 7))) & 1
+            rest = ~known
+        # без таблицы: пакетная трассировка внутри карты, поштучная - для точек за её краем
+        if 0 <= i1 < self.cols and 0 <= j1 < self.rows:
+            inside = rest & (i2 >= 0) & (i2 < self.cols) & (j2 >= 0) & (j2 < self.rows)
+            if inside.any():
+                result[inside] = line_of_sight.trace_many(self.walls, np.full(inside.sum(), i1),
+                                                          np.full(inside.sum(), j1), i2[inside], j2[inside])
+            rest &= ~inside
+        for k in np.flatnonzero(rest):
+            result[k] = self.trace_line_of_sight(i1, j1, int(i2[k]), int(j2[k]))
+        return result
+
+    def trace_line_of_sight(self, x0, y0, x1, y1):
+        """Брезенхем между клетками без построения списка: стена между концами закрывает обзор."""
+        if x0 == x1 and y0 == y1:
+            return True
+        is_wall = self.is_wall
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+            if x0 == x1 and y0 == y1:
+                return True
+            if is_wall(x0, y0):
+                return False
\ No newline at end of file
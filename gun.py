@@ -1,15 +1,24 @@
 # gun.py
+import constants as const
 from visual_base import AnimatedVisual
 
 
 class Gun(AnimatedVisual):
     """Оружие игрока."""
-    def __init__(self, main_game):
-        super().__init__(main_game, '', scale=0.4, animation_time=90)
+    def __init__(self, simulation):
+        super().__init__(simulation, '', scale=0.4, animation_time=90)
         self.reloading = False
         self.frame_counter = 0
         self.damage = 50
 
+    def damage_at(self, distance):
+        """Урон на расстоянии distance: полный до GUN_FALLOFF_START, затем линейно до GUN_MIN_DAMAGE_FACTOR."""
+        if distance <= const.GUN_FALLOFF_START:
+            return self.damage
+        span = const.GUN_FALLOFF_END - const.GUN_FALLOFF_START
+        factor = max(const.GUN_MIN_DAMAGE_FACTOR, 1 - (distance - const.GUN_FALLOFF_START) / span)
+        return round(self.damage * factor)
+
     def animate_fire(self, delta_time):
         """Анимация выстрела (перезарядка)."""
         if self.reloading:
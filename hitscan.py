@@ -0,0 +1,119 @@
+# hitscan.py
+"""Выстрел лучом: DDA по клеткам карты до первой стены и проверка врагов только рядом с пройденными клетками.
+
+Стена (i, j) - квадрат CELL_SIZE с центром в (i, j) * CELL_SIZE (как в collision и при отрисовке).
+"""
+import math
+import numpy as np
+import constants as const
+
+
+class HitResult:
+    """Итог выстрела: попавший враг (или None), расстояние до него и до стены на луче."""
+    __slots__ = ('enemy', 'distance', 'wall_distance')
+
+    def __init__(self, enemy, distance, wall_distance):
+        self.enemy = enemy
+        self.distance = distance
+        self.wall_distance = wall_distance
+
+
+def trace_wall(level, x, y, dir_x, dir_y, max_dist):
+    """DDA от точки по направлению (dir_x, dir_y) единичной длины.
+
+    Возвращает (расстояние до первой стены или max_dist, список пройденных клеток до неё).
+    """
+    cs = const.CELL_SIZE
+    u = x / cs + 0.5
+    v = y / cs + 0.5
+    i = math.floor(u)
+    j = math.floor(v)
+    step_i = 1 if dir_x > 0 else -1
+    step_j = 1 if dir_y > 0 else -1
+    delta_i = cs / abs(dir_x) if dir_x else math.inf
+    delta_j = cs / abs(dir_y) if dir_y else math.inf
+    next_i = ((i + 1 - u) if dir_x > 0 else (u - i)) * delta_i if dir_x else math.inf
+    next_j = ((j + 1 - v) if dir_y > 0 else (v - j)) * delta_j if dir_y else math.inf
+    is_wall = level.is_wall
+    cells = []
+    t = 0.0
+    while t <= max_dist:
+        if is_wall(i, j):
+            return t, cells
+        cells.append((i, j))
+        if next_i < next_j:
+            t = next_i
+            next_i += delta_i
+            i += step_i
+        else:
+            t = next_j
+            next_j += delta_j
+            j += step_j
+    return max_dist, cells
+
+
+def ray_circle(x, y, dir_x, dir_y, cx, cy, r):
+    """Расстояние вдоль луча до круга (0, если начало внутри) или None."""
+    fx = cx - x
+    fy = cy - y
+    along = fx * dir_x + fy * dir_y
+    d2 = fx * fx + fy * fy - along * along
+    if d2 > r * r:
+        return None
+    t = along - math.sqrt(r * r - d2)
+    if t < 0:
+        return 0.0 if fx * fx + fy * fy <= r * r else None
+    return t
+
+
+def index_keys(cells, grid_cell_size, reach):
+    """Клетки индекса врагов, где могут лежать центры кругов радиуса до reach, задевающих клетки луча."""
+    cs = const.CELL_SIZE
+    keys = set()
+    for i, j in cells:
+        i0 = int(((i - 0.5) * cs - reach) // grid_cell_size)
+        i1 = int(((i + 0.5) * cs + reach) // grid_cell_size)
+        j0 = int(((j - 0.5) * cs - reach) // grid_cell_size)
+        j1 = int(((j + 0.5) * cs + reach) // grid_cell_size)
+        for ki in range(i0, i1 + 1):
+            for kj in range(j0, j1 + 1):
+                keys.add((ki, kj))
+    return keys
+
+
+def first_swarm_hit(swarm, x, y, dir_x, dir_y, max_t):
+    """Ближайший живой враг роя на луче: пакетная проверка пересечения с кругами."""
+    idx = swarm.alive_indices()
+    if not idx.size:
+        return None, max_t
+    fx = swarm.x[idx] - x
+    fy = swarm.y[idx] - y
+    r = swarm.size[idx]
+    along = fx * dir_x + fy * dir_y
+    d2 = fx * fx + fy * fy - along * along
+    hit = d2 <= r * r
+    t = np.where(hit, along - np.sqrt(np.maximum(r * r - d2, 0)), np.inf)
+    inside = fx * fx + fy * fy <= r * r
+    t = np.where(inside, 0.0, np.where(t < 0, np.inf, t))
+    k = int(np.argmin(t))
+    if t[k] >= max_t:
+        return None, max_t
+    return swarm.views[idx[k]], float(t[k])
+
+
+def cast(simulation, x, y, angle, max_dist):
+    """Луч из (x, y) под углом angle: первый враг до первой стены в пределах max_dist."""
+    dir_x = math.cos(angle)
+    dir_y = math.sin(angle)
+    wall_distance, cells = trace_wall(simulation.level, x, y, dir_x, dir_y, max_dist)
+    controller = simulation.entity_controller
+    if controller.swarm is not None:
+        enemy, distance = first_swarm_hit(controller.swarm, x, y, dir_x, dir_y, wall_distance)
+        return HitResult(enemy, distance, wall_distance)
+    grid = controller.spatial_grid
+    best, best_t = None, wall_distance
+    for enemy in grid.in_cells(index_keys(cells, grid.cell_size, controller.max_enemy_size)):
+        t = ray_circle(x, y, dir_x, dir_y, enemy.x, enemy.y, enemy.size)
+        if t is not None and t < best_t:
+            best, best_t = enemy, t
+    return HitResult(best, best_t, wall_distance)
\ No newline at end of file
@@ -0,0 +1,86 @@
+# level_file.py
+"""Бинарный формат уровней и их загрузка по одному.
+
+Файл levels/level_<id>.lvl:
+    LEVEL_HEADER: magic, версия, cols, rows, точка появления игрока (в клетках),
+                  число врагов, длина имени;
+    имя уровня в UTF-8;
+    ENEMY_RECORD на каждого врага: код типа (enemies.ENEMY_TYPES) и позиция в клетках;
+    rows * cols байт сетки по строкам: 0 - пусто, иначе номер текстуры стены.
+"""
+import glob
+import os
+import re
+import struct
+import constants as const
+
+LEVEL_MAGIC = b'LVL1'
+LEVEL_VERSION = 1
+LEVEL_HEADER = struct.Struct('<4sHHHffHB')
+ENEMY_RECORD = struct.Struct('<Bff')
+LEVEL_NAME_RE = re.compile(r'level_(\d+)\.lvl$')
+
+
+class LevelData:
+    """Содержимое файла уровня."""
+    def __init__(self, name, grid, cols, rows, spawn, enemies):
+        self.name = name
+        self.grid = grid        # bytes rows * cols
+        self.cols = cols
+        self.rows = rows
+        self.spawn = spawn      # (x, y) игрока в клетках
+        self.enemies = enemies  # [(код типа, x, y)] в клетках
+        # карта по строкам (bytes), как прежние списки из constants
+        self.mini_map = [grid[j * cols:(j + 1) * cols] for j in range(rows)]
+
+
+def level_path(level_id):
+    """Файл уровня по номеру."""
+    return os.path.join(const.LEVEL_DIR, f"level_{level_id}.lvl")
+
+
+def read_header(f):
+    """Читает заголовок и имя уровня из открытого файла."""
+    magic, version, cols, rows, spawn_x, spawn_y, enemy_count, name_len = LEVEL_HEADER.unpack(
+        f.read(LEVEL_HEADER.size))
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError(f"{f.name}: не файл уровня версии {LEVEL_VERSION}")
+    name = f.read(name_len).decode('utf-8')
+    return cols, rows, (spawn_x, spawn_y), enemy_count, name
+
+
+def load_level(level_id):
+    """Читает один уровень целиком."""
+    with open(level_path(level_id), 'rb') as f:
+        cols, rows, spawn, enemy_count, name = read_header(f)
+        enemies = [ENEMY_RECORD.unpack(f.read(ENEMY_RECORD.size)) for _ in range(enemy_count)]
+        grid = f.read(rows * cols)
+    if len(grid) != rows * cols:
+        raise ValueError(f"{level_path(level_id)}: сетка обрезана")
+    return LevelData(name, grid, cols, rows, spawn, enemies)
+
+
+def write_level(level_id, data):
+    """Записывает уровень в файл."""
+    name = data.name.encode('utf-8')
+    os.makedirs(const.LEVEL_DIR, exist_ok=True)
+    with open(level_path(level_id), 'wb') as f:
+        f.write(LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, data.cols, data.rows, *data.spawn,
+                                  len(data.enemies), len(name)))
+        f.write(name)
+        for code, x, y in data.enemies:
+            f.write(ENEMY_RECORD.pack(code, x, y))
+        f.write(data.grid)
+
+
+def level_catalog():
+    """Номера и имена всех уровней в LEVEL_DIR (читаются только заголовки)."""
+    catalog = []
+    for path in glob.glob(os.path.join(const.LEVEL_DIR, "level_*.lvl")):
+        match = LEVEL_NAME_RE.search(path)
+        if match is None:
+            continue
+        with open(path, 'rb') as f:
+            name = read_header(f)[4]
+        catalog.append((int(match.group(1)), name))
+    return sorted(catalog)
\ No newline at end of file
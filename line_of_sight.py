@@ -0,0 +1,98 @@
+# line_of_sight.py
+import hashlib
+import os
+import numpy as np
+import constants as const
+
+LOS_TABLE_VERSION = 1
+LOS_CHUNK = 128  # исходных клеток за один векторный проход
+
+
+def table_cells(walls):
+    """Клетки таблицы: проходимые и стены рядом с ними (в них может стоять центр сущности)."""
+    free = ~walls
+    near = free.copy()
+    padded = np.pad(free, 1)
+    rows, cols = walls.shape
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            near |= padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+    ys, xs = np.nonzero(near)
+    return xs.astype(np.int32), ys.astype(np.int32)
+
+
+def trace_many(walls, x0, y0, x1, y1):
+    """Брезенхем сразу для массивов пар клеток внутри карты; True - между концами нет стен."""
+    arrays = np.broadcast_arrays(x0, y0, x1, y1)
+    shape = arrays[0].shape
+    x0, y0, x1, y1 = (a.astype(np.int32).ravel() for a in arrays)
+    visible = np.ones(x0.size, dtype=bool)
+    dx = np.abs(x1 - x0)
+    dy = -np.abs(y1 - y0)
+    sx = np.where(x0 < x1, 1, -1).astype(np.int32)
+    sy = np.where(y0 < y1, 1, -1).astype(np.int32)
+    err = dx + dy
+    # дальше работаем только с незавершёнными линиями, выбрасывая дошедшие и упёршиеся в стену
+    pos = np.flatnonzero((x0 != x1) | (y0 != y1))
+    state = [a[pos] for a in (x0, y0, x1, y1, dx, dy, sx, sy, err)]
+    while pos.size:
+        x0, y0, x1, y1, dx, dy, sx, sy, err = state
+        e2 = 2 * err
+        step_x = e2 >= dy
+        step_y = e2 <= dx
+        err += np.where(step_x, dy, 0) + np.where(step_y, dx, 0)
+        x0 += np.where(step_x, sx, 0)
+        y0 += np.where(step_y, sy, 0)
+        arrived = (x0 == x1) & (y0 == y1)
+        # промежуточная клетка (не начальная и не конечная) перекрывает обзор
+        blocked = ~arrived & walls[y0, x0]
+        visible[pos[blocked]] = False
+        keep = ~(arrived | blocked)
+        pos = pos[keep]
+        state = [a[keep] for a in state]
+    return visible.reshape(shape)
+
+
+def compute_table(walls, xs, ys):
+    """Брезенхем для всех пар клеток сразу; возвращает упакованную по битам матрицу n x ceil(n/8)."""
+    n = xs.size
+    table = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    for start in range(0, n, LOS_CHUNK):
+        stop = min(start + LOS_CHUNK, n)
+        x0 = np.repeat(xs[start:stop, None], n, axis=1)
+        y0 = np.repeat(ys[start:stop, None], n, axis=1)
+        visible = trace_many(walls, x0, y0, xs[None, :], ys[None, :])
+        table[start:stop] = np.packbits(visible, axis=1)
+    return table
+
+
+def map_hash(walls):
+    """Ключ кэша: форма и содержимое маски стен плюс версия алгоритма."""
+    h = hashlib.sha1()
+    h.update(f"{LOS_TABLE_VERSION}:{walls.shape}".encode())
+    h.update(np.packbits(walls).tobytes())
+    return h.hexdigest()
+
+
+def load_or_build(walls):
+    """Таблица видимости для маски стен: из кэша на диске или посчитанная заново."""
+    xs, ys = table_cells(walls)
+    if xs.size > const.LOS_TABLE_MAX_CELLS:
+        return xs, ys, None
+    path = os.path.join(const.CACHE_DIR, f"los_{map_hash(walls)}.npy")
+    try:
+        table = np.load(path)
+        if table.shape == (xs.size, (xs.size + 7) // 8):
+            return xs, ys, table
+    except (OSError, ValueError):
+        pass
+    table = compute_table(walls, xs, ys)
+    try:
+        os.makedirs(const.CACHE_DIR, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return xs, ys, table
\ No newline at end of file
@@ -1,153 +1,122 @@
 # main_game.py
 import arcade
-import csv
 import os
 import math
-from collections import deque
+import random
+import time
 import constants as const
-from game_level import GameLevel
-from avatar import Avatar
-from entity_controller import EntityController
-from gun import Gun
-from path_solver import PathSolver
+import level_file
+from assets import AssetManager
+from audio_mixer import AudioMixer
+from profiler import Profiler
+from raycaster import RaycastRenderer
+from replay import ReplayRecorder
+from score_store import ScoreRecord, ScoreStore
+from simulation import Simulation, TickInput
+from text_cache import TextCache
+from wall_renderer import WallRenderer
 
 
 class MainGame(arcade.Window):
-    """Главный класс игры, управляет состояниями и рендерингом."""
+    """Главное окно игры: меню, ввод и рендеринг поверх Simulation."""
     def __init__(self):
-        super().__init__(const.SCR_W, const.SCR_H, "Doom-Style Shooter")
+        super().__init__(const.SCR_W, const.SCR_H, "Doom-Style Shooter",
+                         update_rate=1 / const.RENDER_RATE, draw_rate=1 / const.RENDER_RATE)
         self.state = "MAIN_MENU"
         self.selected_level = 0
-        self.level_names = ["Замок", "Лабиринт", "Военная база"]
-        self.total_kills = 0
-        self.time_played = 0
-        self.start_time = 0
-        self.current_score = 0
+        # номера и имена уровней из заголовков файлов; сами карты читаются при запуске уровня
+        self.level_ids, self.level_names = map(list, zip(*level_file.level_catalog()))
+        self.loading_time = 0
         self.menu_items = ["Выбор карты", "Рекорды", "Выход"]
         self.selected_menu_item = 0
         self.selected_map_item = 0
-        self.high_scores_file = "high_scores.csv"
-        self.high_scores = self.load_records()
+        # рекорды по уровням; запись в базу идёт в фоновом потоке
+        self.scores = ScoreStore()
+        self.scores.preload(self.level_ids)
         self.score_saved_this_game = False
+        self.new_record = False
+        self.text_cache = TextCache()
         self.mouse_pos = (0, 0)
         self.keys_pressed = set()
-        self.level = None
-        self.avatar = None
-        self.entity_controller = None
-        self.gun = None
-        self.path_solver = None
-
-        # Звуки
-        self.shotgun_sound = arcade.load_sound("resources/sound/shotgun.wav")
-        self.enemy_pain_sound = arcade.load_sound("resources/sound/npc_pain.wav")
-        self.enemy_death_sound = arcade.load_sound("resources/sound/npc_death.wav")
-        self.enemy_attack_sound = arcade.load_sound("resources/sound/npc_attack.wav")
-        self.avatar_pain_sound = arcade.load_sound("resources/sound/player_pain.wav")
-        self.theme_sound = arcade.load_sound("resources/sound/theme.mp3")
+        self.fire_requested = False
+        self.simulation = None
+        self.wall_renderer = None
+        self.raycast_renderer = None
+        self.first_person = False  # TAB - вид от первого лица
+        self.recorder = None
+        self.profiler = Profiler()  # F3 - оверлей и сбор, F4 - выгрузка в PROFILE_DIR
+        self.sim_accumulator = 0.0  # время кадров, ещё не отработанное тиками симуляции
+        self.render_alpha = 1.0     # доля тика между двумя последними состояниями для отрисовки
+
+        # Звуки и данные уровня грузятся в фоне, меню показывается сразу
+        self.assets = AssetManager()
+        self.assets.preload_sounds(const.PRELOAD_SOUNDS)
+        self.mixer = AudioMixer(self.assets)  # звуки симуляции: пул голосов, запуск раз в кадр
+        self.level_task = None   # загрузка Simulation выбранного уровня
+        self.theme_task = None   # загрузка музыки уровня
+        self.theme_player = None
 
         arcade.set_background_color(arcade.color.BLACK)
 
-    def check_visibility(self, x1, y1, x2, y2, world_map):
-        """Проверка прямой видимости между точками (x1,y1) и (x2,y2) через клетки карты."""
-        x1_cell = int(x1 // const.CELL_SIZE)
-        y1_cell = int(y1 // const.CELL_SIZE)
-        x2_cell = int(x2 // const.CELL_SIZE)
-        y2_cell = int(y2 // const.CELL_SIZE)
-        cells = self.get_cell_line(x1_cell, y1_cell, x2_cell, y2_cell)
-        for (cx, cy) in cells:
-            if (cx, cy) == (x1_cell, y1_cell) or (cx, cy) == (x2_cell, y2_cell):
-                continue
-            if (cx, cy) in world_map:
-                return False
-        return True
-
-    def get_cell_line(self, x0, y0, x1, y1):
-        """Алгоритм Брезенхема для получения списка клеток на линии."""
-        cells = []
-        dx = abs(x1 - x0)
-        dy = -abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx + dy
-        while True:
-            cells.append((x0, y0))
-            if x0 == x1 and y0 == y1:
-                break
-            e2 = 2 * err
-            if e2 >= dy:
-                err += dy
-                x0 += sx
-            if e2 <= dx:
-                err += dx
-                y0 += sy
-        return cells
-
-    def load_records(self):
-        """Загружает таблицу рекордов из CSV."""
-        scores = []
-        try:
-            if os.path.exists(self.high_scores_file):
-                with open(self.high_scores_file, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        row['score'] = int(row['score'])
-                        scores.append(row)
-        except Exception:
-            pass
-        return scores
+    def play_sound(self, name):
+        """Передаёт звук по имени микшеру (обработчик звуков симуляции)."""
+        self.mixer.request(name)
 
     def save_record(self):
-        """Сохраняет текущий счёт в таблицу рекордов."""
-        score_data = {'score': self.current_score}
-        self.high_scores.append(score_data)
-        self.high_scores.sort(key=lambda x: x['score'], reverse=True)
-        self.high_scores = self.high_scores[:3]
-        try:
-            with open(self.high_scores_file, 'w', newline='', encoding='utf-8') as f:
-                fieldnames = ['score']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(self.high_scores)
-        except Exception:
-            pass
+        """Ставит результат игры в очередь записи таблицы рекордов."""
+        sim = self.simulation
+        self.scores.add(ScoreRecord(sim.level_id, int(sim.current_score), sim.time_played, sim.total_kills,
+                                    sim.state == "WIN"))
+        self.text_cache.invalidate('high_scores')
 
     def is_new_record(self):
-        """Проверяет, является ли текущий счёт рекордным."""
-        if not self.high_scores:
-            return True
-        if len(self.high_scores) < 3:
-            return True
-        min_score = min(score['score'] for score in self.high_scores)
-        return self.current_score > min_score
+        """Проверяет, попадает ли текущий счёт в рекорды уровня."""
+        return self.scores.is_new_record(self.simulation.level_id, int(self.simulation.current_score))
 
     def start_level(self, level_id=0):
-        """Инициализация нового уровня."""
-        self.level = GameLevel(self, level_id)
-        start_pos = const.AVATAR_START_POSITIONS.get(level_id, (1.5, 5))
-        self.avatar = Avatar(self)
-        self.avatar.set_coordinates(*start_pos)
-        self.entity_controller = EntityController(self, level_id)
-        self.gun = Gun(self)
-        self.path_solver = PathSolver(self)
-        self.total_kills = 0
-        self.start_time = 0
-        self.time_played = 0
-        self.current_score = 0
+        """Запускает фоновую загрузку уровня; игра начнётся в finish_loading."""
+        self.stop_recording()
+        self.stop_theme()
+        self.assets.start_batch()
+        self.level_task = self.assets.submit(Simulation, level_id, seed=random.randrange(2 ** 63),
+                                             profiler=self.profiler)
+        self.theme_task = self.assets.load_music(const.THEME_MUSIC)
+
+    def finish_loading(self):
+        """Уровень загружен: окно подключается к симуляции, начинается игра."""
+        self.simulation = self.level_task.result()
+        self.level_task = None
+        self.simulation.sound_handler = self.play_sound
+        if const.RECORD_REPLAYS:
+            self.recorder = ReplayRecorder(const.REPLAY_FILE, self.simulation)
+        self.wall_renderer = WallRenderer(self.simulation.level)
+        self.raycast_renderer = RaycastRenderer(self.ctx, self.simulation.level)
+        self.fire_requested = False
+        self.sim_accumulator = 0.0
+        self.render_alpha = 1.0
         self.score_saved_this_game = False
-        arcade.play_sound(self.theme_sound, looping=True)
+        self.theme_player = arcade.play_sound(self.theme_task.result(), loop=True)
+        self.theme_task = None
+        self.state = "PLAYING"
+
+    def stop_theme(self):
+        """Останавливает музыку уровня, если она играет."""
+        if self.theme_player is not None:
+            arcade.stop_sound(self.theme_player)
+            self.theme_player = None
 
-    def compute_score(self):
-        """Вычисляет текущий счёт на основе убийств, времени и здоровья."""
-        kill_points = self.total_kills * 100
-        time_bonus = max(0, 300 - self.time_played) * 10
-        health_bonus = self.avatar.hp * 2
-        total = kill_points + time_bonus + health_bonus
-        return int(total)
+    def stop_recording(self):
+        """Закрывает запись текущей сессии, если она ведётся."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def on_draw(self):
         self.clear()
         if self.state == "PLAYING":
             self.draw_game()
+            if self.profiler.enabled:
+                self.profiler.draw_overlay()
         elif self.state == "MAIN_MENU":
             self.draw_main_menu()
         elif self.state == "MAP_SELECT":
@@ -164,121 +133,187 @@ class MainGame(arcade.Window):
     def draw_game(self):
         """Отрисовка игрового процесса."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, const.GROUND_COLOR)
+        avatar = self.simulation.avatar
+        camera_x, camera_y = avatar.render_position(self.render_alpha)
+        profiler = self.profiler
+        if self.first_person:
+            with profiler.section('draw_raycast'):
+                self.raycast_renderer.draw(self.simulation, camera_x, camera_y, self.render_alpha)
+            with profiler.section('draw_hud'):
+                self.draw_hud()
+            return
         # отрисовка стен
-        for (x, y), texture_id in self.level.world_map.items():
-            screen_x = x * const.CELL_SIZE - self.avatar.x + const.SCR_HW
-            screen_y = y * const.CELL_SIZE - self.avatar.y + const.SCR_HH
-            if -const.CELL_SIZE <= screen_x <= const.SCR_W + const.CELL_SIZE and -const.CELL_SIZE <= screen_y <= const.SCR_H + const.CELL_SIZE:
-                color = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)][(texture_id - 1) % 5]
-                arcade.draw_lbwh_rectangle_filled(
-                    screen_x - const.CELL_SIZE // 2,
-                    screen_y - const.CELL_SIZE // 2,
-                    const.CELL_SIZE,
-                    const.CELL_SIZE,
-                    color
-                )
-        self.entity_controller.draw_all()
-        self.avatar.draw()
-        self.draw_hud()
+        with profiler.section('draw_walls'):
+            self.wall_renderer.draw(camera_x, camera_y)
+        with profiler.section('draw_entities'):
+            self.simulation.entity_controller.draw_all(camera_x, camera_y, self.render_alpha)
+            avatar.draw()
+        with profiler.section('draw_hud'):
+            self.draw_hud()
 
     def draw_hud(self):
         """Отрисовка интерфейса (здоровье, убийства, время, очки)."""
-        arcade.draw_text(f"Здоровье: {self.avatar.hp}", 10, const.SCR_H - 30, arcade.color.WHITE, 20, anchor_x="left")
-        arcade.draw_text(f"Убито: {self.total_kills}", 10, const.SCR_H - 60, arcade.color.WHITE, 20, anchor_x="left")
-        arcade.draw_text(f"Время: {int(self.time_played)} сек.", 10, const.SCR_H - 90, arcade.color.WHITE, 20, anchor_x="left")
-        arcade.draw_text(f"Очки: {int(self.current_score)}", 10, const.SCR_H - 120, arcade.color.WHITE, 20, anchor_x="left")
+        sim = self.simulation
+        texts = self.text_cache
+        texts.draw('hp', f"Здоровье: {sim.avatar.hp}", 10, const.SCR_H - 30, arcade.color.WHITE, 20, anchor_x="left")
+        texts.draw('kills', f"Убито: {sim.total_kills}", 10, const.SCR_H - 60, arcade.color.WHITE, 20, anchor_x="left")
+        texts.draw('time', f"Время: {int(sim.time_played)} сек.", 10, const.SCR_H - 90, arcade.color.WHITE, 20, anchor_x="left")
+        texts.draw('score', f"Очки: {int(sim.current_score)}", 10, const.SCR_H - 120, arcade.color.WHITE, 20, anchor_x="left")
 
     def draw_main_menu(self):
         """Отрисовка главного меню."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, const.MENU_BACKGROUND)
-        arcade.draw_text("DOOM STYLE SHOOTER", const.SCR_HW, const.SCR_H - 150, arcade.color.RED, 74, anchor_x="center")
+        self.text_cache.draw_static('main_menu', lambda: [
+            ("DOOM STYLE SHOOTER", const.SCR_HW, const.SCR_H - 150, arcade.color.RED, 74, {'anchor_x': "center"}),
+            ("Управление: ↑↓ - выбор, ENTER - подтвердить, ESC - выход",
+             const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, {'anchor_x': "center"}),
+        ])
         for i, item in enumerate(self.menu_items):
             color = arcade.color.YELLOW if i == self.selected_menu_item else arcade.color.LIGHT_GRAY
-            arcade.draw_text(item, const.SCR_HW, const.SCR_H - 350 - i * 100, color, 48, anchor_x="center")
-        arcade.draw_text("Управление: ↑↓ - выбор, ENTER - подтвердить, ESC - выход",
-                        const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, anchor_x="center")
+            self.text_cache.draw(('menu', i), item, const.SCR_HW, const.SCR_H - 350 - i * 100, color, 48, anchor_x="center")
 
     def draw_map_select(self):
         """Отрисовка меню выбора карты."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, const.MENU_BACKGROUND)
-        arcade.draw_text("ВЫБОР КАРТЫ", const.SCR_HW, const.SCR_H - 150, arcade.color.YELLOW, 74, anchor_x="center")
+        self.text_cache.draw_static('map_select', lambda: [
+            ("ВЫБОР КАРТЫ", const.SCR_HW, const.SCR_H - 150, arcade.color.YELLOW, 74, {'anchor_x': "center"}),
+            ("ENTER - начать игру, ESC - назад в меню",
+             const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, {'anchor_x': "center"}),
+        ])
         for i, map_name in enumerate(self.level_names):
             color = arcade.color.GOLD if i == self.selected_map_item else arcade.color.LIGHT_GRAY
-            arcade.draw_text(map_name, const.SCR_HW, const.SCR_H - 350 - i * 100, color, 48, anchor_x="center")
-        arcade.draw_text("ENTER - начать игру, ESC - назад в меню",
-                        const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, anchor_x="center")
+            self.text_cache.draw(('map', i), map_name, const.SCR_HW, const.SCR_H - 350 - i * 100, color, 48, anchor_x="center")
+
+    def high_score_lines(self):
+        """Надписи таблицы рекордов."""
+        lines = [("ТАБЛИЦА РЕКОРДОВ", const.SCR_HW, const.SCR_H - 150, arcade.color.YELLOW, 74, {'anchor_x': "center"})]
+        best = self.scores.leaderboard()
+        if best:
+            # колонка на каждый уровень и лучший результат за всё время под ними
+            column_w = const.SCR_W / len(self.level_ids)
+            for k, (level_id, name) in enumerate(zip(self.level_ids, self.level_names)):
+                x = column_w * (k + 0.5)
+                lines.append((name, x, const.SCR_H - 280, arcade.color.GOLD, 36, {'anchor_x': "center"}))
+                for i, record in enumerate(self.scores.leaderboard(level_id)):
+                    lines.append((f"{i + 1}. {record.score} ({record.kills} уб., {int(record.time_played)} сек.)",
+                                  x, const.SCR_H - 360 - i * 60, arcade.color.WHITE, 28, {'anchor_x': "center"}))
+            lines.append((f"Лучший результат: {best[0].score} очков", const.SCR_HW, const.SCR_H - 620,
+                          arcade.color.LIGHT_GREEN, 36, {'anchor_x': "center"}))
+        else:
+            lines.append(("Пока нет рекордов. Сыграйте игру!",
+                          const.SCR_HW, const.SCR_H - 300, arcade.color.LIGHT_SALMON, 48, {'anchor_x': "center"}))
+        lines.append(("ESC - назад в меню", const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, {'anchor_x': "center"}))
+        return lines
 
     def draw_high_scores(self):
         """Отрисовка таблицы рекордов."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, const.MENU_BACKGROUND)
-        arcade.draw_text("ТАБЛИЦА РЕКОРДОВ", const.SCR_HW, const.SCR_H - 150, arcade.color.YELLOW, 74, anchor_x="center")
-        if self.high_scores:
-            for i, score_data in enumerate(self.high_scores[:3]):
-                arcade.draw_text(f"{i + 1}. {int(score_data['score'])} очков",
-                                const.SCR_HW, const.SCR_H - 300 - i * 100, arcade.color.WHITE, 48, anchor_x="center")
-        else:
-            arcade.draw_text("Пока нет рекордов. Сыграйте игру!",
-                            const.SCR_HW, const.SCR_H - 300, arcade.color.LIGHT_SALMON, 48, anchor_x="center")
-        arcade.draw_text("ESC - назад в меню", const.SCR_HW, 100, arcade.color.LIGHT_GOLDENROD_YELLOW, 24, anchor_x="center")
+        self.text_cache.draw_static('high_scores', self.high_score_lines)
 
     def draw_loading_screen(self):
         """Экран загрузки."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, arcade.color.BLACK)
-        dots = "." * (int(self.time_played) % 4)
-        arcade.draw_text(f"ЗАГРУЗКА{dots}", const.SCR_HW, const.SCR_HH, arcade.color.WHITE, 74, anchor_x="center")
-        arcade.draw_text(f"Карта: {self.level_names[self.selected_level]}",
-                        const.SCR_HW, const.SCR_HH - 100, arcade.color.GOLD, 48, anchor_x="center")
+        dots = "." * (int(self.loading_time) % 4)
+        self.text_cache.draw('loading', f"ЗАГРУЗКА{dots}", const.SCR_HW, const.SCR_HH, arcade.color.WHITE, 74, anchor_x="center")
+        self.text_cache.draw('loading_map', f"Карта: {self.level_names[self.selected_level]}",
+                             const.SCR_HW, const.SCR_HH - 100, arcade.color.GOLD, 48, anchor_x="center")
+        # полоса прогресса фоновой загрузки
+        bar_w = 600
+        progress = self.assets.progress()
+        arcade.draw_lbwh_rectangle_filled(const.SCR_HW - bar_w / 2, const.SCR_HH - 200, bar_w, 20, arcade.color.DARK_GRAY)
+        arcade.draw_lbwh_rectangle_filled(const.SCR_HW - bar_w / 2, const.SCR_HH - 200, bar_w * progress, 20, arcade.color.GOLD)
 
-    def draw_game_over_screen(self):
-        """Экран проигрыша."""
-        arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, (30, 0, 0))
-        arcade.draw_text("ВЫ ПРОИГРАЛИ", const.SCR_HW, const.SCR_H - 150, arcade.color.RED, 74, anchor_x="center")
+    def finish_game(self):
+        """Один раз после конца игры: сохранение результата, проверка рекорда, сброс собранного экрана итогов."""
+        if self.score_saved_this_game:
+            return
+        # проверка до добавления: иначе результат сравнивается сам с собой
+        self.new_record = self.is_new_record()
+        self.save_record()
+        self.score_saved_this_game = True
+        self.text_cache.invalidate('result')
+
+    def result_lines(self, title, title_color, time_label, stat_color, stat_step, record_size):
+        """Надписи экрана итогов игры."""
+        sim = self.simulation
         stats = [
             f"Карта: {self.level_names[self.selected_level]}",
-            f"Уничтожено врагов: {self.total_kills}",
-            f"Время выживания: {int(self.time_played)} сек.",
-            f"Финальные очки: {int(self.current_score)}"
+            f"Уничтожено врагов: {sim.total_kills}",
+            f"{time_label}: {int(sim.time_played)} сек.",
+            f"Финальные очки: {int(sim.current_score)}"
         ]
+        lines = [(title, const.SCR_HW, const.SCR_H - 150, title_color, 74, {'anchor_x': "center"})]
         for i, stat in enumerate(stats):
-            arcade.draw_text(stat, const.SCR_HW, const.SCR_H - 300 - i * 70, arcade.color.LIGHT_SALMON, 48, anchor_x="center")
-        if self.is_new_record() and not self.score_saved_this_game:
-            arcade.draw_text("НОВЫЙ РЕКОРД!", const.SCR_HW, const.SCR_H - 600, arcade.color.YELLOW, 48, anchor_x="center")
-            self.save_record()
-            self.score_saved_this_game = True
-        arcade.draw_text("Нажмите ПРОБЕЛ для возврата в меню",
-                        const.SCR_HW, 150, arcade.color.GOLD, 36, anchor_x="center")
+            lines.append((stat, const.SCR_HW, const.SCR_H - 300 - i * stat_step, stat_color, 48, {'anchor_x': "center"}))
+        if self.new_record:
+            lines.append(("НОВЫЙ РЕКОРД!", const.SCR_HW, const.SCR_H - 600, arcade.color.YELLOW, record_size,
+                          {'anchor_x': "center"}))
+        lines.append(("Нажмите ПРОБЕЛ для возврата в меню", const.SCR_HW, 150, arcade.color.GOLD, 36,
+                      {'anchor_x': "center"}))
+        return lines
+
+    def draw_game_over_screen(self):
+        """Экран проигрыша."""
+        arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, (30, 0, 0))
+        self.text_cache.draw_static('result', lambda: self.result_lines(
+            "ВЫ ПРОИГРАЛИ", arcade.color.RED, "Время выживания", arcade.color.LIGHT_SALMON, 70, 48))
 
     def draw_win_screen(self):
         """Экран победы."""
         arcade.draw_lbwh_rectangle_filled(0, 0, const.SCR_W, const.SCR_H, (0, 30, 0))
-        arcade.draw_text("ПОБЕДА!", const.SCR_HW, const.SCR_H - 150, arcade.color.GREEN, 74, anchor_x="center")
-        stats = [
-            f"Карта: {self.level_names[self.selected_level]}",
-            f"Уничтожено врагов: {self.total_kills}",
-            f"Время прохождения: {int(self.time_played)} сек.",
-            f"Финальные очки: {int(self.current_score)}"
-        ]
-        for i, stat in enumerate(stats):
-            arcade.draw_text(stat, const.SCR_HW, const.SCR_H - 300 - i * 60, arcade.color.LIGHT_GREEN, 48, anchor_x="center")
-        if self.is_new_record() and not self.score_saved_this_game:
-            arcade.draw_text("НОВЫЙ РЕКОРД!", const.SCR_HW, const.SCR_H - 600, arcade.color.YELLOW, 74, anchor_x="center")
-            self.save_record()
-            self.score_saved_this_game = True
-        arcade.draw_text("Нажмите ПРОБЕЛ для возврата в меню",
-                        const.SCR_HW, 150, arcade.color.GOLD, 36, anchor_x="center")
+        self.text_cache.draw_static('result', lambda: self.result_lines(
+            "ПОБЕДА!", arcade.color.GREEN, "Время прохождения", arcade.color.LIGHT_GREEN, 60, 74))
+
+    def read_tick_input(self):
+        """Преобразует клавиши и мышь окна в ввод тика симуляции."""
+        keys = self.keys_pressed
+        move_x = (arcade.key.D in keys) - (arcade.key.A in keys)
+        move_y = (arcade.key.W in keys) - (arcade.key.S in keys)
+        mx, my = self.mouse_pos
+        angle = math.atan2(my - const.SCR_HH, mx - const.SCR_HW)
+        fire = self.fire_requested
+        self.fire_requested = False
+        tick_input = TickInput(move_x, move_y, angle, fire)
+        if self.recorder is not None:
+            tick_input = self.recorder.record(tick_input)
+        return tick_input
+
+    def advance_simulation(self, delta_time):
+        """Прогоняет столько тиков фиксированной длины, сколько накопилось времени кадров."""
+        tick = 1 / const.UPDATE_RATE
+        self.sim_accumulator += delta_time
+        steps = 0
+        while self.sim_accumulator >= tick:
+            if steps == const.MAX_SIM_STEPS_PER_FRAME:
+                # не догоняем бесконечно: отставание сверх предела отбрасывается (игра замедляется)
+                self.sim_accumulator %= tick
+                break
+            self.simulation.step(tick, self.read_tick_input())
+            self.sim_accumulator -= tick
+            steps += 1
+            if self.simulation.state != "PLAYING":
+                self.state = self.simulation.state
+                self.stop_recording()
+                self.finish_game()
+                break
+        self.render_alpha = min(self.sim_accumulator / tick, 1.0)
+
+    def export_profile(self):
+        """Сохраняет историю профайлера в CSV и JSON."""
+        os.makedirs(const.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(const.PROFILE_DIR, time.strftime("profile_%Y%m%d_%H%M%S"))
+        self.profiler.export_csv(base + ".csv")
+        self.profiler.export_json(base + ".json")
 
     def on_update(self, delta_time):
+        self.profiler.next_frame()
         if self.state == "PLAYING":
-            self.time_played += delta_time
-            self.avatar.update_state(delta_time)
-            self.entity_controller.update_all(delta_time)
-            self.gun.animate_fire(delta_time)
-            self.total_kills = len([e for e in self.entity_controller.enemy_list if not e.is_alive])
-            self.current_score = self.compute_score()
+            self.advance_simulation(delta_time)
+            self.mixer.flush()
         elif self.state == "LOADING":
-            self.time_played += delta_time
-            if self.time_played > 1:
-                self.state = "PLAYING"
+            self.loading_time += delta_time
+            if self.level_task.done() and self.theme_task.done():
+                self.finish_loading()
 
     def on_key_press(self, key, modifiers):
         self.keys_pressed.add(key)
@@ -305,32 +340,39 @@ class MainGame(arcade.Window):
             elif key == arcade.key.ENTER:
                 self.selected_level = self.selected_map_item
                 self.state = "LOADING"
-                self.time_played = 0
-                self.start_level(self.selected_level)
+                self.loading_time = 0
+                self.start_level(self.level_ids[self.selected_level])
             elif key == arcade.key.ESCAPE:
                 self.state = "MAIN_MENU"
         elif self.state == "HIGH_SCORES":
             if key == arcade.key.ESCAPE:
                 self.state = "MAIN_MENU"
         elif self.state == "PLAYING":
+            if key == arcade.key.F3:
+                self.profiler.toggle()
+            elif key == arcade.key.F4 and self.profiler.enabled:
+                self.export_profile()
+            elif key == arcade.key.TAB:
+                self.first_person = not self.first_person
             if key == arcade.key.ESCAPE:
                 self.state = "MAIN_MENU"
-                arcade.stop_sound(self.theme_sound)
+                self.stop_recording()
+                self.stop_theme()
+                self.mixer.stop_all()
             if key == arcade.key.SPACE:
-                self.avatar.shot = True
-                self.avatar.shots_fired += 1
-                arcade.play_sound(self.shotgun_sound)
-                self.entity_controller.add_muzzle_flash(const.SCR_HW, const.SCR_HH)
-                for enemy in self.entity_controller.enemy_list:
-                    if enemy.is_alive and self.check_visibility(self.avatar.x, self.avatar.y, enemy.x, enemy.y, self.level.world_map):
-                        enemy.take_damage(self.gun.damage)
-                self.avatar.shot = False
+                self.fire_requested = True
         elif self.state in ["GAME_OVER", "WIN"]:
             if key == arcade.key.SPACE or key == arcade.key.ENTER:
                 self.state = "MAIN_MENU"
             elif key == arcade.key.ESCAPE:
                 arcade.close_window()
 
+    def on_close(self):
+        self.stop_recording()
+        self.assets.shutdown()
+        self.scores.close()
+        super().on_close()
+
     def on_key_release(self, key, modifiers):
         if key in self.keys_pressed:
             self.keys_pressed.remove(key)
@@ -340,15 +382,7 @@ class MainGame(arcade.Window):
 
     def on_mouse_press(self, x, y, button, modifiers):
         if self.state == "PLAYING" and button == arcade.MOUSE_BUTTON_LEFT:
-            self.avatar.shot = True
-            self.avatar.shots_fired += 1
-            arcade.play_sound(self.shotgun_sound)
-            self.entity_controller.add_muzzle_flash(const.SCR_HW, const.SCR_HH)
-            for enemy in self.entity_controller.enemy_list:
-                if enemy.is_alive and self.check_visibility(self.avatar.x, self.avatar.y, enemy.x, enemy.y, self.level.world_map):
-                    enemy.take_damage(self.gun.damage)
-            self.avatar.shot = False
-
+            self.fire_requested = True
 
 def main():
     game = MainGame()
@@ -0,0 +1,101 @@
+# nav_table.py
+"""Предрасчёт таблиц следующего шага для всех пар клеток поставляемых уровней.
+
+Сборка (один раз после изменения карт):
+    python nav_table.py
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import deque
+import numpy as np
+import constants as const
+from level_file import level_catalog
+
+NAV_MAGIC = b'NAV1'
+NAV_HEADER = struct.Struct('<4sHHHH20s')  # magic, версия, rows, cols, число клеток, sha1 карты
+NAV_VERSION = 1
+NO_HOP = 0xFFFF  # пути нет
+
+
+def nav_path(level_id):
+    """Файл таблицы для уровня."""
+    return os.path.join(const.NAV_DIR, f"level_{level_id}.nav")
+
+
+def map_digest(mini_map):
+    """sha1 содержимого карты (для проверки, что таблица собрана для неё)."""
+    return hashlib.sha1(bytes(v & 0xFF for row in mini_map for v in row)).digest()
+
+
+def build_table(graph, rows, cols):
+    """BFS от каждой цели: table[s, g] - плоский индекс следующей клетки на пути из s в g."""
+    cells = sorted(graph, key=lambda c: c[1] * cols + c[0])
+    index = {cell: k for k, cell in enumerate(cells)}
+    table = np.full((len(cells), len(cells)), NO_HOP, dtype=np.uint16)
+    for g, goal in enumerate(cells):
+        column = table[:, g]
+        column[g] = goal[1] * cols + goal[0]
+        queue = deque([goal])
+        while queue:
+            cur = queue.popleft()
+            hop = cur[1] * cols + cur[0]
+            for next_node in graph[cur]:
+                k = index[next_node]
+                if column[k] == NO_HOP:
+                    column[k] = hop
+                    queue.append(next_node)
+    flat = np.array([c[1] * cols + c[0] for c in cells], dtype=np.uint16)
+    return flat, table
+
+
+def write_table(path, mini_map, graph):
+    """Записывает таблицу уровня в бинарный файл."""
+    rows, cols = len(mini_map), len(mini_map[0])
+    if rows * cols >= NO_HOP:
+        raise ValueError(f"карта {cols}x{rows} не помещается в индексы uint16")
+    flat, table = build_table(graph, rows, cols)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(NAV_HEADER.pack(NAV_MAGIC, NAV_VERSION, rows, cols, flat.size, map_digest(mini_map)))
+        f.write(flat.tobytes())
+        f.write(table.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_table(path, mini_map):
+    """Отображает файл в память; возвращает (индекс клеток, число клеток, таблица) или None.
+
+    Таблица - memoryview формата uint16 поверх mmap: table[s * count + g].
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(NAV_HEADER.size)
+            magic, version, rows, cols, count, digest = NAV_HEADER.unpack(header)
+            if (magic != NAV_MAGIC or version != NAV_VERSION or rows != len(mini_map)
+                    or cols != len(mini_map[0]) or digest != map_digest(mini_map)):
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+    data = memoryview(mapped)[NAV_HEADER.size:NAV_HEADER.size + 2 * (count + count * count)].cast('H')
+    index = [-1] * (rows * cols)
+    for k, flat in enumerate(data[:count]):
+        index[flat] = k
+    return index, count, data[count:]
+
+
+def main():
+    from simulation import Simulation
+    for level_id, _ in level_catalog():
+        sim = Simulation(level_id)
+        path = nav_path(level_id)
+        graph = sim.path_solver.build_graph()
+        write_table(path, sim.level.mini_map, graph)
+        print(f"{path}: {len(graph)} клеток")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
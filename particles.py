@@ -0,0 +1,162 @@
+# particles.py
+"""Пул частиц эффектов в массивах фиксированной ёмкости.
+
+Живые частицы занимают первые count ячеек; умершие замещаются частицами с конца
+пула (swap-remove), поэтому ни добавление, ни удаление не создаёт объектов Python.
+Весь пул рисуется одним вызовом: экземпляры квадрата с круглой маской во фрагментном шейдере.
+"""
+import math
+import numpy as np
+from arcade.gl import BufferDescription
+import constants as const
+
+VERTEX_SHADER = """
+#version 330
+uniform vec2 offset;  // сдвиг мира к экрану (камера)
+uniform vec2 screen;
+in vec2 in_corner;
+in vec2 in_pos;
+in float in_size;
+in vec4 in_color;
+out vec2 corner;
+out vec4 color;
+void main() {
+    vec2 pos = in_pos + offset + in_corner * in_size;
+    gl_Position = vec4(pos / screen * 2.0 - 1.0, 0.0, 1.0);
+    corner = in_corner;
+    color = in_color;
+}
+"""
+FRAGMENT_SHADER = """
+#version 330
+in vec2 corner;
+in vec4 color;
+out vec4 frag_color;
+void main() {
+    if (dot(corner, corner) > 1.0) {
+        discard;
+    }
+    frag_color = color;
+}
+"""
+INSTANCE_FORMAT = '2f 1f 4f'  # позиция, радиус, цвет с альфой (0..1)
+INSTANCE_FLOATS = 7
+
+
+class ParticleSystem:
+    """Частицы уровня: выпуск по видам из PARTICLE_KINDS, пакетное обновление и отрисовка."""
+    def __init__(self, capacity=const.PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.size = np.zeros(capacity)
+        self.grow = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.fields = (self.x, self.y, self.vx, self.vy, self.life, self.max_life, self.size, self.grow, self.color)
+        self.rng = np.random.default_rng(seed)
+        self.renderer = None  # создаётся при первой отрисовке
+
+    def emit(self, kind, x, y, angle=0.0, spread=math.pi):
+        """Выпускает частицы вида kind из точки (x, y) в секторе angle ± spread; при полном пуле лишние отбрасываются."""
+        params = const.PARTICLE_KINDS[kind]
+        n = min(params['count'], self.capacity - self.count)
+        if n <= 0:
+            return
+        s = slice(self.count, self.count + n)
+        self.x[s] = x
+        self.y[s] = y
+        if params['speed']:
+            directions = angle + self.rng.uniform(-spread, spread, n)
+            speeds = params['speed'] * self.rng.uniform(0.5, 1.0, n)
+            self.vx[s] = np.cos(directions) * speeds
+            self.vy[s] = np.sin(directions) * speeds
+        else:
+            self.vx[s] = 0.0
+            self.vy[s] = 0.0
+        self.life[s] = params['life']
+        self.max_life[s] = params['life']
+        self.size[s] = params['size']
+        self.grow[s] = params['grow']
+        self.color[s] = np.array(params['color'], dtype=np.float32) / 255
+        self.count += n
+
+    def update(self, delta_time):
+        """Продвигает живые частицы и удаляет истёкшие."""
+        n = self.count
+        if not n:
+            return
+        self.life[:n] -= delta_time
+        self.x[:n] += self.vx[:n] * delta_time
+        self.y[:n] += self.vy[:n] * delta_time
+        damping = max(0.0, 1.0 - const.PARTICLE_DRAG * delta_time)
+        self.vx[:n] *= damping
+        self.vy[:n] *= damping
+        size = self.size[:n]
+        size += self.grow[:n] * delta_time
+        np.maximum(size, 0.0, out=size)
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if dead.size:
+            self.remove(dead)
+
+    def remove(self, dead):
+        """Swap-remove: дыры среди первых живых заполняются живыми частицами из хвоста."""
+        n = self.count
+        keep = n - dead.size
+        holes = dead[dead < keep]
+        movers = np.flatnonzero(self.life[keep:n] > 0) + keep
+        for field in self.fields:
+            field[holes] = field[movers]
+        self.count = keep
+
+    def alpha(self):
+        """Прозрачность живых частиц: убывает с остатком жизни."""
+        n = self.count
+        return np.clip(self.life[:n] / self.max_life[:n], 0.0, 1.0)
+
+    def clear(self):
+        """Удаляет все частицы."""
+        self.count = 0
+
+    def draw(self, camera_x, camera_y):
+        """Отрисовка всех живых частиц относительно камеры одним вызовом."""
+        if not self.count:
+            return
+        if self.renderer is None:
+            import arcade
+            self.renderer = ParticleRenderer(arcade.get_window().ctx, self.capacity)
+        self.renderer.draw(self, camera_x, camera_y)
+
+
+class ParticleRenderer:
+    """Буфер экземпляров на весь пул и программа для отрисовки частиц кругами."""
+    def __init__(self, ctx, capacity):
+        self.ctx = ctx
+        self.instances = np.zeros((capacity, INSTANCE_FLOATS), dtype=np.float32)
+        corners = np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype=np.float32)
+        self.instance_buffer = ctx.buffer(reserve=self.instances.nbytes, usage='stream')
+        self.geometry = ctx.geometry(
+            [BufferDescription(ctx.buffer(data=corners), '2f', ['in_corner']),
+             BufferDescription(self.instance_buffer, INSTANCE_FORMAT, ['in_pos', 'in_size', 'in_color'],
+                               instanced=True)],
+            mode=ctx.TRIANGLE_STRIP)
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        self.program['screen'] = (const.SCR_W, const.SCR_H)
+
+    def draw(self, particles, camera_x, camera_y):
+        """Загружает живые частицы в буфер экземпляров и рисует их."""
+        n = particles.count
+        data = self.instances[:n]
+        data[:, 0] = particles.x[:n]
+        data[:, 1] = particles.y[:n]
+        data[:, 2] = particles.size[:n]
+        data[:, 3:6] = particles.color[:n]
+        data[:, 6] = particles.alpha()
+        self.instance_buffer.write(data.tobytes())
+        self.program['offset'] = (const.SCR_HW - camera_x, const.SCR_HH - camera_y)
+        self.ctx.enable(self.ctx.BLEND)
+        self.geometry.render(self.program, instances=n)
\ No newline at end of file
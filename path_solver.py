@@ -1,21 +1,59 @@
 # path_solver.py
 from collections import deque
-from functools import lru_cache
+import numpy as np
+import constants as const
+import nav_table
+
+NO_DIRECTION = 255  # в поле потока: из клетки нет пути к цели
 
 
 class PathSolver:
-    """Поиск пути для NPC (BFS на графе проходимых клеток)."""
-    def __init__(self, main_game):
-        self.main_game = main_game
-        self.mini_map = main_game.level.mini_map
+    """Поиск пути для NPC (BFS на графе проходимых клеток, граф строится по чанкам при обращении)."""
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.mini_map = simulation.level.mini_map
         self.ways = [(-1, 0), (0, -1), (1, 0), (0, 1), (-1, -1), (1, -1), (1, 1), (-1, 1)]
-        self.graph = {}
-        self.build_graph()
+        self.way_index = {way: k for k, way in enumerate(self.ways)}
+        self.rows = simulation.level.rows
+        self.cols = simulation.level.cols
+        self.graph = {}            # клетка -> соседи, только для уже построенных чанков
+        self.graph_chunks = {}     # (ci, cj) построенного чанка -> его проходимые клетки в self.graph
+        # предрасчитанная таблица следующего шага (только для поставляемых уровней)
+        self.nav_index = None
+        self.nav_count = 0
+        self.nav_table = None
+        self.load_nav_table()
+        # поле потока к игроку: для клетки (j * cols + i) индекс шага в self.ways
+        self.flow_goal = None
+        self.flow_field = bytearray([NO_DIRECTION]) * (self.rows * self.cols)
+        self.flow_cells = np.zeros(0, dtype=np.int64)  # клетки, заполненные последним update_flow_field
+
+    def load_nav_table(self):
+        """Отображает в память таблицу уровня, если она собрана для этой карты."""
+        level = self.simulation.level
+        if level.level_data is None:
+            return
+        loaded = nav_table.load_table(nav_table.nav_path(level.level_id), self.mini_map)
+        if loaded is not None:
+            self.nav_index, self.nav_count, self.nav_table = loaded
 
-    @lru_cache(maxsize=None)
     def find_path(self, start, goal):
-        """Возвращает следующую клетку на пути от start к goal."""
+        """Возвращает следующую клетку на пути от start к goal (start, если пути нет)."""
+        if self.nav_table is not None:
+            cols = self.cols
+            if 0 <= start[0] < cols and 0 <= goal[0] < cols and 0 <= start[1] < self.rows and 0 <= goal[1] < self.rows:
+                s = self.nav_index[start[1] * cols + start[0]]
+                g = self.nav_index[goal[1] * cols + goal[0]]
+                if s >= 0 and g >= 0:
+                    hop = self.nav_table[s * self.nav_count + g]
+                    return start if hop == nav_table.NO_HOP else (hop % cols, hop // cols)
+        return self.find_path_bfs(start, goal)
+
+    def find_path_bfs(self, start, goal):
+        """Следующая клетка на пути от start к goal поиском в ширину (без таблицы)."""
         visited = self.breadth_first_search(start, goal)
+        if goal not in visited:
+            return start
         path = [goal]
         step = visited.get(goal, start)
         while step and step != start:
@@ -31,20 +69,122 @@ class PathSolver:
             cur_node = queue.popleft()
             if cur_node == goal:
                 break
-            next_nodes = self.graph.get(cur_node, [])
+            next_nodes = self.neighbors(cur_node)
             for next_node in next_nodes:
                 if next_node not in visited:
                     queue.append(next_node)
                     visited[next_node] = cur_node
         return visited
 
+    def is_walkable(self, x, y):
+        """Клетка внутри карты и не стена."""
+        return 0 <= x < self.cols and 0 <= y < self.rows and not self.simulation.level.is_wall(x, y)
+
     def get_neighbors(self, x, y):
-        """Возвращает список соседних проходимых клеток."""
-        return [(x + dx, y + dy) for dx, dy in self.ways if (x + dx, y + dy) not in self.main_game.level.world_map]
+        """Возвращает список соседних проходимых клеток (по диагонали - без срезания углов)."""
+        neighbors = []
+        for dx, dy in self.ways:
+            if not self.is_walkable(x + dx, y + dy):
+                continue
+            if dx and dy and not (self.is_walkable(x + dx, y) and self.is_walkable(x, y + dy)):
+                continue
+            neighbors.append((x + dx, y + dy))
+        return neighbors
+
+    def build_chunk(self, ci, cj):
+        """Добавляет в граф проходимые клетки чанка (ci, cj)."""
+        cells = self.graph_chunks[(ci, cj)] = []
+        size = const.CHUNK_CELLS
+        for y in range(cj * size, min((cj + 1) * size, self.rows)):
+            row = self.mini_map[y]
+            for x in range(ci * size, min((ci + 1) * size, self.cols)):
+                if not row[x]:
+                    self.graph[(x, y)] = self.get_neighbors(x, y)
+                    cells.append((x, y))
+
+    def unload_far(self, goal):
+        """Выгружает чанки графа дальше CHUNK_KEEP_MARGIN от окна поля потока вокруг goal."""
+        size = const.CHUNK_CELLS
+        reach = const.FLOW_FIELD_RADIUS + const.CHUNK_KEEP_MARGIN * size
+        ci0, ci1 = (goal[0] - reach) // size, (goal[0] + reach) // size
+        cj0, cj1 = (goal[1] - reach) // size, (goal[1] + reach) // size
+        if len(self.graph_chunks) <= (ci1 - ci0 + 1) * (cj1 - cj0 + 1):
+            return
+        graph = self.graph
+        for ci, cj in list(self.graph_chunks):
+            if not (ci0 <= ci <= ci1 and cj0 <= cj <= cj1):
+                for cell in self.graph_chunks.pop((ci, cj)):
+                    del graph[cell]
+
+    def neighbors(self, cell):
+        """Соседи клетки в графе (пусто для стены и клетки вне карты); строит её чанк при первом обращении."""
+        next_nodes = self.graph.get(cell)
+        if next_nodes is not None:
+            return next_nodes
+        chunk = (cell[0] // const.CHUNK_CELLS, cell[1] // const.CHUNK_CELLS)
+        if chunk in self.graph_chunks or not (0 <= cell[0] < self.cols and 0 <= cell[1] < self.rows):
+            return []
+        self.build_chunk(*chunk)
+        return self.graph.get(cell, [])
 
     def build_graph(self):
-        """Строит граф проходимости по карте."""
-        for y, row in enumerate(self.mini_map):
-            for x, col in enumerate(row):
-                if not col:
-                    self.graph[(x, y)] = self.get_neighbors(x, y)
\ No newline at end of file
+        """Строит граф проходимости по всей карте (для таблиц nav_table); возвращает его."""
+        size = const.CHUNK_CELLS
+        for cj in range((self.rows + size - 1) // size):
+            for ci in range((self.cols + size - 1) // size):
+                if (ci, cj) not in self.graph_chunks:
+                    self.build_chunk(ci, cj)
+        return self.graph
+
+    def cell_at(self, x, y):
+        """Клетка карты, внутри которой лежит точка (клетка (i, j) с центром в (i, j) * CELL_SIZE)."""
+        half = const.CELL_SIZE / 2
+        return int((x + half) // const.CELL_SIZE), int((y + half) // const.CELL_SIZE)
+
+    def update_flow_field(self, goal):
+        """BFS от клетки цели в окне FLOW_FIELD_RADIUS клеток вокруг неё; пересчёт только при смене клетки цели.
+
+        Вне окна поле пустое: дальние враги идут к игроку напрямую, пока не подойдут ближе.
+        Стоимость пересчёта ограничена размером окна, а не карты.
+        """
+        if goal == self.flow_goal:
+            return
+        self.flow_goal = goal
+        self.unload_far(goal)
+        field = self.flow_field
+        np.frombuffer(field, dtype=np.uint8)[self.flow_cells] = NO_DIRECTION
+        self.flow_cells = np.zeros(0, dtype=np.int64)
+        if not self.neighbors(goal):
+            return
+        cols = self.cols
+        way_index = self.way_index
+        radius = const.FLOW_FIELD_RADIUS
+        goal_x, goal_y = goal
+        queue = deque([goal])
+        visited = {goal}
+        filled = []
+        while queue:
+            cur_x, cur_y = cur = queue.popleft()
+            for next_node in self.neighbors(cur):
+                if next_node in visited:
+                    continue
+                next_x, next_y = next_node
+                if abs(next_x - goal_x) > radius or abs(next_y - goal_y) > radius:
+                    continue
+                visited.add(next_node)
+                queue.append(next_node)
+                flat = next_y * cols + next_x
+                field[flat] = way_index[(cur_x - next_x, cur_y - next_y)]
+                filled.append(flat)
+        self.flow_cells = np.array(filled, dtype=np.int64)
+
+    def flow_target(self, x, y):
+        """Центр следующей клетки на пути к цели поля потока или None, если пути нет."""
+        i, j = self.cell_at(x, y)
+        if not (0 <= i < self.cols and 0 <= j < self.rows):
+            return None
+        direction = self.flow_field[j * self.cols + i]
+        if direction == NO_DIRECTION:
+            return None
+        dx, dy = self.ways[direction]
+        return (i + dx) * const.CELL_SIZE, (j + dy) * const.CELL_SIZE
\ No newline at end of file
@@ -0,0 +1,147 @@
+# profiler.py
+"""Покадровый профайлер подсистем: кольцевой буфер замеров, оверлей и выгрузка в CSV/JSON.
+
+Замер участка:
+    with profiler.section('ai'):
+        ...
+Выключенный профайлер стоит одну проверку флага на входе и выходе из участка.
+"""
+import json
+import time
+import arcade
+import numpy as np
+import constants as const
+from text_cache import TextCache
+
+MAX_SECTIONS = 16
+HISTOGRAM_BINS = 25
+HISTOGRAM_MAX_MS = 50.0
+
+
+class ProfileSection:
+    """Именованный участок кадра; время копится в текущем кадре профайлера."""
+    __slots__ = ('profiler', 'slot', 'start')
+
+    def __init__(self, profiler, slot):
+        self.profiler = profiler
+        self.slot = slot
+        self.start = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            self.profiler.current[self.slot] += time.perf_counter() - self.start
+            self.start = None
+
+
+class Profiler:
+    """Время участков по кадрам в кольцевом буфере на capacity кадров."""
+    def __init__(self, capacity=const.PROFILE_HISTORY, enabled=False):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.sections = {}   # имя -> ProfileSection
+        self.names = []      # имена по номеру столбца
+        self.current = [0.0] * MAX_SECTIONS
+        self.samples = np.zeros((capacity, MAX_SECTIONS))  # секунды на участок за кадр
+        self.frame_times = np.zeros(capacity)
+        self.count = 0       # сколько кадров записано всего
+        self.frame_start = None
+        self.text_cache = TextCache()
+
+    def section(self, name):
+        """Участок по имени (создаётся при первом обращении)."""
+        section = self.sections.get(name)
+        if section is None:
+            if len(self.names) == MAX_SECTIONS:
+                raise ValueError(f"не больше {MAX_SECTIONS} участков профайлера")
+            section = ProfileSection(self, len(self.names))
+            self.sections[name] = section
+            self.names.append(name)
+        return section
+
+    def toggle(self):
+        """Включает или выключает сбор; при включении история начинается заново."""
+        self.enabled = not self.enabled
+        self.count = 0
+        self.frame_start = None
+        self.current = [0.0] * MAX_SECTIONS
+
+    def next_frame(self):
+        """Закрывает текущий кадр: его замеры уходят в буфер, накопители обнуляются."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            row = self.count % self.capacity
+            self.samples[row] = self.current
+            self.frame_times[row] = now - self.frame_start
+            self.count += 1
+        self.frame_start = now
+        self.current = [0.0] * MAX_SECTIONS
+
+    def history(self):
+        """Записанные кадры по порядку: (время кадров, замеры участков) в секундах."""
+        n = min(self.count, self.capacity)
+        order = (np.arange(n) + self.count - n) % self.capacity
+        return self.frame_times[order], self.samples[order, :len(self.names)]
+
+    def summary(self):
+        """Сводка: p50/p99 времени кадра и среднее/максимум по участкам, в мс."""
+        frames, samples = self.history()
+        if not frames.size:
+            return {'frames': 0, 'frame_p50_ms': 0.0, 'frame_p99_ms': 0.0, 'sections': {}}
+        p50, p99 = np.percentile(frames, [50, 99]) * 1000
+        sections = {name: {'mean_ms': float(samples[:, k].mean() * 1000),
+                           'max_ms': float(samples[:, k].max() * 1000)}
+                    for k, name in enumerate(self.names)}
+        return {'frames': int(frames.size), 'frame_p50_ms': float(p50), 'frame_p99_ms': float(p99),
+                'sections': sections}
+
+    def export_csv(self, path):
+        """Кадры по строкам: время кадра и участков в мс."""
+        frames, samples = self.history()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(",".join(['frame_ms'] + self.names) + "\n")
+            for frame, row in zip(frames, samples):
+                f.write(",".join(f"{v * 1000:.4f}" for v in (frame, *row)) + "\n")
+
+    def export_json(self, path):
+        """Сводка и полная история в мс."""
+        frames, samples = self.history()
+        data = self.summary()
+        data['frame_ms'] = (frames * 1000).round(4).tolist()
+        data['section_ms'] = {name: (samples[:, k] * 1000).round(4).tolist() for k, name in enumerate(self.names)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def draw_overlay(self):
+        """Оверлей: время участков, гистограмма времени кадра и p50/p99."""
+        frames, samples = self.history()
+        texts = self.text_cache
+        left, top = const.SCR_W - 420, const.SCR_H - 20
+        arcade.draw_lbwh_rectangle_filled(left - 10, top - 400, 420, 410, (0, 0, 0, 180))
+        if not frames.size:
+            texts.draw('frame', "Профайлер: нет данных", left, top - 20, arcade.color.WHITE, 14)
+            return
+        p50, p99 = np.percentile(frames, [50, 99]) * 1000
+        texts.draw('frame', f"Кадр: p50 {p50:.2f} мс  p99 {p99:.2f} мс  ({frames.size} кадров)",
+                   left, top - 20, arcade.color.WHITE, 14)
+        last = samples[-1] * 1000
+        mean = samples.mean(axis=0) * 1000
+        for k, name in enumerate(self.names):
+            texts.draw(('section', name), f"{name:<16} {last[k]:7.3f} {mean[k]:7.3f} мс",
+                       left, top - 50 - k * 20, arcade.color.LIGHT_GRAY, 12, font_name="Courier New")
+        # гистограмма времени кадра
+        counts, _ = np.histogram(np.minimum(frames * 1000, HISTOGRAM_MAX_MS - 1e-6),
+                                 bins=HISTOGRAM_BINS, range=(0, HISTOGRAM_MAX_MS))
+        bar_w = 400 / HISTOGRAM_BINS
+        scale = 100 / counts.max()
+        for k, c in enumerate(counts):
+            if c:
+                arcade.draw_lbwh_rectangle_filled(left + k * bar_w, top - 390, bar_w - 1, c * scale,
+                                                  arcade.color.ORANGE)
+        texts.draw('histogram', f"0 - {HISTOGRAM_MAX_MS:.0f} мс", left, top - 285, arcade.color.GRAY, 10)
\ No newline at end of file
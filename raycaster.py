@@ -0,0 +1,171 @@
+# raycaster.py
+"""Вид от первого лица: RAY_COUNT лучей за кадр векторным DDA по сетке уровня.
+
+Кадр собирается в массиве NumPy RAY_COUNT x RAY_IMAGE_HEIGHT и одним вызовом
+загружается в текстуру, которая растягивается на всё окно.
+"""
+import math
+import numpy as np
+import constants as const
+
+VERTEX_SHADER = """
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    uv = vec2(in_uv.x, 1.0 - in_uv.y);  // строка 0 массива - верх кадра
+}
+"""
+FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D frame;
+in vec2 uv;
+out vec4 color;
+void main() {
+    color = vec4(texture(frame, uv).rgb, 1.0);
+}
+"""
+SIDE_SHADE = 0.7      # грани, перпендикулярные оси y, темнее
+DEPTH_SHADE = 0.00002  # затемнение с расстоянием: 1 / (1 + k * depth^2)
+
+
+class Raycaster:
+    """Расчёт кадра от первого лица на NumPy (без OpenGL)."""
+    def __init__(self, level, width=const.RAY_COUNT, height=const.RAY_IMAGE_HEIGHT):
+        self.level = level
+        self.width = width
+        self.height = height
+        # столбец 0 - левый край кадра; в мире с осью y вверх левее взгляда - больший угол
+        self.ray_offsets = const.HALF_FOV - (np.arange(width) + 0.5) * const.ANGLE_STEP
+        self.fisheye = np.cos(self.ray_offsets)
+        self.screen_dist = (width / 2) / math.tan(const.HALF_FOV)
+        self.rows = np.arange(height, dtype=np.float32)[:, None]
+        self.wall_colors = np.array(const.WALL_COLORS, dtype=np.float32)
+        # фон: потолок и пол
+        self.background = np.empty((height, width, 3), dtype=np.uint8)
+        self.background[:height // 2] = const.CEILING_COLOR
+        self.background[height // 2:] = const.GROUND_COLOR
+        self.image = self.background.copy()
+
+    def cast(self, x, y, angle):
+        """Все лучи сразу: (глубина вдоль луча, id текстуры стены или 0, признак грани по y)."""
+        cs = const.CELL_SIZE
+        grid = self.level.grid
+        rows, cols = grid.shape
+        max_depth = const.RAY_MAX_DEPTH * cs
+        n = self.width
+        angles = angle + self.ray_offsets
+        dir_x = np.cos(angles)
+        dir_y = np.sin(angles)
+        u = x / cs + 0.5
+        v = y / cs + 0.5
+        i0 = math.floor(u)
+        j0 = math.floor(v)
+        with np.errstate(divide='ignore'):
+            delta_i = np.abs(cs / dir_x)
+            delta_j = np.abs(cs / dir_y)
+        next_i = np.where(dir_x > 0, i0 + 1 - u, u - i0) * delta_i
+        next_j = np.where(dir_y > 0, j0 + 1 - v, v - j0) * delta_j
+        next_i[dir_x == 0] = np.inf
+        next_j[dir_y == 0] = np.inf
+        step_i = np.where(dir_x > 0, 1, -1)
+        step_j = np.where(dir_y > 0, 1, -1)
+        depth = np.full(n, float(max_depth))
+        texture = np.zeros(n, dtype=np.int64)
+        side = np.zeros(n, dtype=bool)
+        # работаем только с лучами, ещё не упёршимися в стену
+        ray = np.arange(n)
+        ci = np.full(n, i0)
+        cj = np.full(n, j0)
+        while ray.size:
+            take_i = next_i < next_j
+            t = np.where(take_i, next_i, next_j)
+            ci = ci + np.where(take_i, step_i, 0)
+            cj = cj + np.where(take_i, 0, step_j)
+            next_i = next_i + np.where(take_i, delta_i, 0)
+            next_j = next_j + np.where(take_i, 0, delta_j)
+            inside = (ci >= 0) & (ci < cols) & (cj >= 0) & (cj < rows)
+            value = np.zeros(ray.size, dtype=np.int64)
+            value[inside] = grid[cj[inside], ci[inside]]
+            hit = (value > 0) & (t <= max_depth)
+            depth[ray[hit]] = t[hit]
+            texture[ray[hit]] = value[hit]
+            side[ray[hit]] = ~take_i[hit]
+            keep = ~hit & inside & (t < max_depth)
+            ray = ray[keep]
+            ci, cj, t = ci[keep], cj[keep], t[keep]
+            next_i, next_j = next_i[keep], next_j[keep]
+            delta_i, delta_j = delta_i[keep], delta_j[keep]
+            step_i, step_j = step_i[keep], step_j[keep]
+        return depth, texture, side
+
+    def render(self, camera_x, camera_y, angle, billboards=()):
+        """Кадр (height x width x 3, uint8) из точки камеры; billboards - (x, y, радиус, цвет)."""
+        depth, texture, side = self.cast(camera_x, camera_y, angle)
+        depth *= self.fisheye
+        height = self.height
+        proj = np.minimum(self.screen_dist * const.CELL_SIZE / np.maximum(depth, 1e-3), height * 4)
+        top = (height - proj) / 2
+        mask = (self.rows >= top) & (self.rows < top + proj)
+        mask &= (texture > 0)
+        shade = 1 / (1 + DEPTH_SHADE * depth * depth)
+        shade[side] *= SIDE_SHADE
+        colors = self.wall_colors[(texture - 1) % len(self.wall_colors)] * shade[:, None]
+        image = self.image
+        np.copyto(image, self.background)
+        np.copyto(image, colors.astype(np.uint8)[None, :, :], where=mask[:, :, None])
+        self.draw_billboards(image, depth, camera_x, camera_y, angle, billboards)
+        return image
+
+    def draw_billboards(self, image, depth, camera_x, camera_y, angle, billboards):
+        """Спрайты врагов прямоугольниками от дальних к ближним; столбцы за стенами не рисуются."""
+        if not len(billboards):
+            return
+        data = np.array([(x, y, r) for x, y, r, _ in billboards], dtype=np.float64)
+        dx = data[:, 0] - camera_x
+        dy = data[:, 1] - camera_y
+        delta = (np.arctan2(dy, dx) - angle + math.pi) % (2 * math.pi) - math.pi
+        perp = np.hypot(dx, dy) * np.cos(delta)
+        size = self.screen_dist * 2 * data[:, 2] / np.maximum(perp, 1e-3)
+        center = (const.HALF_FOV - delta) / const.ANGLE_STEP
+        visible = (perp > 1) & (np.abs(delta) < const.HALF_FOV + np.arctan2(data[:, 2], np.maximum(perp, 1)))
+        width, height = self.width, self.height
+        for k in np.flatnonzero(visible)[np.argsort(-perp[visible])]:
+            c0 = max(int(center[k] - size[k] / 2), 0)
+            c1 = min(int(center[k] + size[k] / 2) + 1, width)
+            if c0 >= c1:
+                continue
+            columns = np.flatnonzero(depth[c0:c1] > perp[k]) + c0
+            if not columns.size:
+                continue
+            r0 = max(int((height - size[k]) / 2), 0)
+            r1 = min(int((height + size[k]) / 2) + 1, height)
+            shade = 1 / (1 + DEPTH_SHADE * perp[k] * perp[k])
+            color = np.array(billboards[k][3][:3], dtype=np.float32) * shade
+            image[r0:r1, columns] = color.astype(np.uint8)
+
+
+class RaycastRenderer:
+    """Вывод кадра Raycaster: одна загрузка текстуры и один полноэкранный прямоугольник."""
+    def __init__(self, ctx, level):
+        from arcade.gl import geometry
+        self.raycaster = Raycaster(level)
+        self.texture = ctx.texture((self.raycaster.width, self.raycaster.height), components=3,
+                                   filter=(ctx.NEAREST, ctx.NEAREST))
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        self.program['frame'] = 0
+        self.quad = geometry.quad_2d_fs()
+
+    def draw(self, simulation, camera_x, camera_y, alpha=1.0):
+        """Рисует вид из положения камеры в направлении взгляда игрока."""
+        billboards = []
+        for enemy in simulation.entity_controller.enemy_list:
+            if enemy.is_alive:
+                x, y = enemy.render_position(alpha)
+                billboards.append((x, y, enemy.size, enemy.color))
+        image = self.raycaster.render(camera_x, camera_y, simulation.avatar.angle, billboards)
+        self.texture.write(image)
+        self.texture.use(0)
+        self.quad.render(self.program)
\ No newline at end of file
@@ -0,0 +1,148 @@
+# replay.py
+"""Запись ввода игровой сессии и её воспроизведение без окна на максимальной скорости.
+
+Формат файла: заголовок REPLAY_HEADER, затем по TICK_RECORD на каждый тик.
+Число тиков и хэш итогового состояния дописываются в заголовок при закрытии записи.
+
+Воспроизведение:
+    python replay.py replays/last.rpl
+    python replay.py replays/last.rpl --timings ticks.csv
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+import constants as const
+from profiler import Profiler
+from simulation import Simulation, TickInput
+
+REPLAY_MAGIC = b'RPL1'
+REPLAY_VERSION = 1
+# magic, версия, seed, уровень, тиков в секунду, флаги, число тиков, sha1 итогового состояния
+REPLAY_HEADER = struct.Struct('<4sHQhHBI20s')
+TICK_RECORD = struct.Struct('<Bf')  # биты: move_x + 1, move_y + 1 (по 2), fire; угол float32
+FLAG_VECTORIZED_AI = 1
+
+
+def pack_input(tick_input):
+    """Кодирует ввод тика в запись файла."""
+    bits = (tick_input.move_x + 1) | (tick_input.move_y + 1) << 2 | bool(tick_input.fire) << 4
+    return TICK_RECORD.pack(bits, tick_input.angle)
+
+
+def unpack_input(data, offset=0):
+    """Декодирует запись файла в ввод тика."""
+    bits, angle = TICK_RECORD.unpack_from(data, offset)
+    return TickInput((bits & 3) - 1, (bits >> 2 & 3) - 1, angle, bool(bits >> 4 & 1))
+
+
+def state_hash(sim):
+    """sha1 игрового состояния: исход, счёт, игрок и все враги."""
+    h = hashlib.sha1()
+    h.update(repr((sim.state, sim.total_kills, sim.current_score, sim.time_played)).encode())
+    avatar = sim.avatar
+    h.update(repr((avatar.x, avatar.y, avatar.hp, sim.stats.shots_fired, sim.stats.damage_taken)).encode())
+    for enemy in sim.entity_controller.enemy_list:
+        h.update(repr((float(enemy.x), float(enemy.y), float(enemy.hp), bool(enemy.is_alive))).encode())
+    return h.digest()
+
+
+class ReplayRecorder:
+    """Пишет seed, уровень и ввод каждого тика сессии в файл."""
+    def __init__(self, path, sim):
+        if sim.seed is None:
+            raise ValueError("для записи нужна симуляция с явным seed")
+        self.sim = sim
+        self.ticks = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'wb')
+        flags = FLAG_VECTORIZED_AI if sim.entity_controller.swarm is not None else 0
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, sim.seed, sim.level_id,
+                                           const.UPDATE_RATE, flags, 0, bytes(20)))
+
+    def record(self, tick_input):
+        """Записывает ввод тика и возвращает его в том виде, в каком он будет прочитан при воспроизведении."""
+        data = pack_input(tick_input)
+        self.file.write(data)
+        self.ticks += 1
+        return unpack_input(data)
+
+    def close(self):
+        """Дописывает в заголовок число тиков и хэш итогового состояния."""
+        if self.file.closed:
+            return
+        self.file.seek(REPLAY_HEADER.size - 24)
+        self.file.write(struct.pack('<I20s', self.ticks, state_hash(self.sim)))
+        self.file.close()
+
+
+def load_replay(path):
+    """Читает файл записи; возвращает (заголовок в виде словаря, список вводов)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, level_id, tick_rate, flags, ticks, digest = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path}: не файл записи версии {REPLAY_VERSION}")
+    count = (len(data) - REPLAY_HEADER.size) // TICK_RECORD.size
+    inputs = [unpack_input(data, REPLAY_HEADER.size + k * TICK_RECORD.size) for k in range(count)]
+    header = {'seed': seed, 'level_id': level_id, 'tick_rate': tick_rate,
+              'vectorized_ai': bool(flags & FLAG_VECTORIZED_AI), 'ticks': ticks, 'digest': digest}
+    return header, inputs
+
+
+def run_replay(header, inputs, profiler=None):
+    """Прогоняет ввод через Simulation.step без отрисовки; возвращает (симуляция, время тиков в нс)."""
+    sim = Simulation(header['level_id'], seed=header['seed'], vectorized_ai=header['vectorized_ai'],
+                     profiler=profiler)
+    dt = 1 / header['tick_rate']
+    timings = []
+    clock = time.perf_counter_ns
+    for tick_input in inputs:
+        start = clock()
+        sim.step(dt, tick_input)
+        timings.append(clock() - start)
+        if profiler is not None:
+            profiler.next_frame()
+    return sim, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанной сессии без окна.")
+    parser.add_argument('path', help="файл записи (.rpl)")
+    parser.add_argument('--timings', help="сохранить время каждого тика в CSV")
+    parser.add_argument('--profile', help="замерить участки тика и сохранить их в JSON")
+    args = parser.parse_args()
+
+    header, inputs = load_replay(args.path)
+    profiler = Profiler(capacity=max(len(inputs), 1), enabled=True) if args.profile else None
+    start = time.perf_counter()
+    sim, timings = run_replay(header, inputs, profiler)
+    total = time.perf_counter() - start
+    digest = state_hash(sim)
+    ordered = sorted(timings) or [0]
+    print(f"Уровень {header['level_id']}, seed {header['seed']}, тиков {len(inputs)} за {total:.2f} с")
+    print(f"Тик: p50 {ordered[len(ordered) // 2] / 1e6:.3f} мс, p99 {ordered[len(ordered) * 99 // 100] / 1e6:.3f} мс, "
+          f"макс {ordered[-1] / 1e6:.3f} мс")
+    print(f"Итог: {sim.state}, убито {sim.total_kills}, очки {int(sim.current_score)}, хэш {digest.hex()}")
+    if args.timings:
+        with open(args.timings, 'w', encoding='utf-8') as f:
+            f.write("tick,ns\n")
+            f.writelines(f"{tick},{ns}\n" for tick, ns in enumerate(timings))
+    if profiler is not None:
+        profiler.export_json(args.profile)
+        for name, stats in profiler.summary()['sections'].items():
+            print(f"  {name:<12} среднее {stats['mean_ms']:.3f} мс, макс {stats['max_ms']:.3f} мс")
+    if header['ticks'] != len(inputs) or header['digest'] == bytes(20):
+        print("Запись не была закрыта, сверка итогового состояния пропущена.")
+        return 0
+    if digest != header['digest']:
+        print(f"РАСХОЖДЕНИЕ: при записи хэш был {header['digest'].hex()}")
+        return 1
+    print("Итоговое состояние совпадает с записанным.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,138 @@
+# score_store.py
+"""Таблица рекордов в SQLite (журнал WAL) с записью в фоновом потоке.
+
+Каждый результат - отдельная строка, вставка идёт одной транзакцией, так что сбой
+посреди записи не портит уже сохранённые рекорды. Лучшие результаты уровня читаются
+по индексу (level_id, score) и держатся в памяти: экран рекордов и проверка нового
+рекорда не обращаются к диску из потока отрисовки.
+"""
+import csv
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import constants as const
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    level_id INTEGER,          -- NULL для рекордов из старого high_scores.csv
+    score INTEGER NOT NULL,
+    time_played REAL,
+    kills INTEGER,
+    won INTEGER,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level_id, score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+"""
+
+
+class ScoreRecord:
+    """Один результат игры."""
+    __slots__ = ('level_id', 'score', 'time_played', 'kills', 'won')
+
+    def __init__(self, level_id, score, time_played=None, kills=None, won=None):
+        self.level_id = level_id
+        self.score = score
+        self.time_played = time_played
+        self.kills = kills
+        self.won = won
+
+
+def connect(path):
+    """Соединение с базой рекордов в режиме WAL."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ScoreStore:
+    """Рекорды по уровням: чтение лучших при старте, запись через очередь фонового потока."""
+    def __init__(self, path=const.SCORE_DB, top=const.HIGH_SCORE_TOP):
+        self.path = path
+        self.top = top
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scores")
+        self.writer = None  # соединение потока записи, открывается в нём же
+        self.leaders = {}   # level_id (None - все уровни) -> лучшие ScoreRecord по убыванию очков
+        with closing(connect(path)) as conn, conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] == 0:
+                self.import_legacy(conn)
+
+    def import_legacy(self, conn):
+        """Переносит рекорды из старого CSV (без уровня) в пустую базу."""
+        if not os.path.exists(const.LEGACY_SCORES_FILE):
+            return
+        try:
+            with open(const.LEGACY_SCORES_FILE, 'r', newline='', encoding='utf-8') as f:
+                scores = [int(row['score']) for row in csv.DictReader(f)]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"{const.LEGACY_SCORES_FILE}: старые рекорды не перенесены ({e})", file=sys.stderr)
+            return
+        now = time.time()
+        conn.executemany("INSERT INTO scores (score, created) VALUES (?, ?)", [(s, now) for s in scores])
+
+    def load_top(self, level_id):
+        """Лучшие результаты уровня (None - всех уровней) запросом по индексу."""
+        with closing(connect(self.path)) as conn:
+            if level_id is None:
+                rows = conn.execute("SELECT level_id, score, time_played, kills, won FROM scores "
+                                    "ORDER BY score DESC LIMIT ?", (self.top,)).fetchall()
+            else:
+                rows = conn.execute("SELECT level_id, score, time_played, kills, won FROM scores "
+                                    "WHERE level_id = ? ORDER BY score DESC LIMIT ?", (level_id, self.top)).fetchall()
+        return [ScoreRecord(*row) for row in rows]
+
+    def preload(self, level_ids):
+        """Читает лучшие результаты уровней и общий список заранее (при старте, не из отрисовки)."""
+        for level_id in (None, *level_ids):
+            self.leaderboard(level_id)
+
+    def leaderboard(self, level_id=None):
+        """Лучшие результаты уровня из памяти (с диска - только при первом обращении)."""
+        leaders = self.leaders.get(level_id)
+        if leaders is None:
+            leaders = self.leaders[level_id] = self.load_top(level_id)
+        return leaders
+
+    def is_new_record(self, level_id, score):
+        """Попадает ли счёт в лучшие результаты уровня."""
+        leaders = self.leaderboard(level_id)
+        return len(leaders) < self.top or score > leaders[-1].score
+
+    def add(self, record):
+        """Сразу учитывает результат в таблицах в памяти и ставит его запись на диск в очередь."""
+        for key in (record.level_id, None):
+            leaders = self.leaderboard(key)
+            leaders.append(record)
+            leaders.sort(key=lambda r: r.score, reverse=True)
+            del leaders[self.top:]
+        return self.executor.submit(self.write, record)
+
+    def write(self, record):
+        """Вставка результата одной транзакцией (выполняется в потоке записи)."""
+        try:
+            if self.writer is None:
+                self.writer = connect(self.path)
+            with self.writer:
+                self.writer.execute(
+                    "INSERT INTO scores (level_id, score, time_played, kills, won, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    (record.level_id, record.score, record.time_played, record.kills, record.won, time.time()))
+        except sqlite3.Error as e:
+            print(f"{self.path}: рекорд {record.score} не сохранён ({e})", file=sys.stderr)
+            raise
+
+    def close(self):
+        """Дожидается записи всех результатов из очереди и закрывает базу."""
+        self.executor.submit(self.close_writer)
+        self.executor.shutdown(wait=True)
+
+    def close_writer(self):
+        """Закрывает соединение потока записи (выполняется в нём же)."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
\ No newline at end of file
@@ -0,0 +1,132 @@
+# simulation.py
+import random
+import constants as const
+import hitscan
+from events import EventBus, GameStats, ShotFired, connect_sounds
+from game_level import GameLevel
+from avatar import Avatar
+from entity_controller import EntityController
+from gun import Gun
+from path_solver import PathSolver
+from profiler import Profiler
+
+
+class TickInput:
+    """Ввод игрока на один тик в виде простых данных (без клавиш и мыши окна)."""
+    __slots__ = ('move_x', 'move_y', 'angle', 'fire')
+
+    def __init__(self, move_x=0, move_y=0, angle=0.0, fire=False):
+        self.move_x = move_x  # -1, 0 или 1
+        self.move_y = move_y  # -1, 0 или 1
+        self.angle = angle    # направление взгляда, радианы
+        self.fire = fire      # выстрел в этом тике
+
+
+class Simulation:
+    """Игровая логика уровня без окна, звука и OpenGL-контекста."""
+    def __init__(self, level_id=0, seed=None, mini_map=None, vectorized_ai=False, profiler=None):
+        self.level_id = level_id
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.state = "PLAYING"
+        self.time_played = 0
+        self.current_score = 0
+        self.input = TickInput()
+        self.sound_handler = None  # вызывается с именем звука, если задан
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.events = EventBus()  # урон, гибель врагов и выстрелы
+        self.stats = GameStats(self, self.events)  # счётчики, победа и поражение по событиям
+        connect_sounds(self.events, self.play_sound)
+        self.level = GameLevel(self, level_id, mini_map)
+        self.avatar = Avatar(self)
+        self.avatar.set_coordinates(*self.level.spawn)
+        self.entity_controller = EntityController(self, level_id, vectorized_ai)
+        self.gun = Gun(self)
+        self.path_solver = PathSolver(self)
+
+    @property
+    def total_kills(self):
+        """Число убитых врагов."""
+        return self.stats.kills
+
+    def play_sound(self, name):
+        """Передаёт запрос на звук внешнему обработчику (в headless-режиме игнорируется)."""
+        if self.sound_handler is not None:
+            self.sound_handler(name)
+
+    def check_visibility(self, x1, y1, x2, y2, world_map):
+        """Проверка прямой видимости между точками (x1,y1) и (x2,y2) через клетки карты."""
+        if world_map is self.level.world_map:
+            return self.level.has_line_of_sight(x1, y1, x2, y2)
+        x1_cell = int(x1 // const.CELL_SIZE)
+        y1_cell = int(y1 // const.CELL_SIZE)
+        x2_cell = int(x2 // const.CELL_SIZE)
+        y2_cell = int(y2 // const.CELL_SIZE)
+        cells = self.get_cell_line(x1_cell, y1_cell, x2_cell, y2_cell)
+        for (cx, cy) in cells:
+            if (cx, cy) == (x1_cell, y1_cell) or (cx, cy) == (x2_cell, y2_cell):
+                continue
+            if (cx, cy) in world_map:
+                return False
+        return True
+
+    def get_cell_line(self, x0, y0, x1, y1):
+        """Алгоритм Брезенхема для получения списка клеток на линии."""
+        cells = []
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            cells.append((x0, y0))
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+        return cells
+
+    def compute_score(self):
+        """Вычисляет текущий счёт на основе убийств, времени и здоровья."""
+        kill_points = self.total_kills * 100
+        time_bonus = max(0, 300 - self.time_played) * 10
+        health_bonus = self.avatar.hp * 2
+        total = kill_points + time_bonus + health_bonus
+        return int(total)
+
+    def fire(self):
+        """Выстрел игрока лучом по направлению взгляда: урон первому врагу до стены."""
+        self.avatar.shot = True
+        self.avatar.aim_with_mouse()
+        hit = hitscan.cast(self, self.avatar.x, self.avatar.y, self.avatar.angle, const.GUN_RANGE)
+        if hit.enemy is not None:
+            hit.enemy.take_damage(self.gun.damage_at(hit.distance))
+        self.events.publish(ShotFired(self.avatar.x, self.avatar.y, self.avatar.angle, hit))
+        self.avatar.shot = False
+        return hit
+
+    def step(self, delta_time, tick_input=None):
+        """Один тик симуляции."""
+        if tick_input is not None:
+            self.input = tick_input
+        if self.state != "PLAYING":
+            return
+        self.avatar.store_previous_position()
+        self.entity_controller.store_previous_positions()
+        if self.input.fire:
+            self.fire()
+        self.time_played += delta_time
+        profiler = self.profiler
+        with profiler.section('avatar'):
+            self.avatar.update_state(delta_time)
+        with profiler.section('flow_field'):
+            self.path_solver.update_flow_field(self.path_solver.cell_at(self.avatar.x, self.avatar.y))
+        self.entity_controller.update_all(delta_time)
+        with profiler.section('gun'):
+            self.gun.animate_fire(delta_time)
+        self.current_score = self.compute_score()
\ No newline at end of file
@@ -0,0 +1,78 @@
+# spatial_grid.py
+import constants as const
+
+
+class SpatialGrid:
+    """Равномерная хеш-сетка: объекты с координатами x, y разложены по клеткам."""
+    def __init__(self, cell_size=const.CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}  # (i, j) -> список объектов в клетке
+        self.cells = {}    # объект -> (i, j), где он сейчас лежит
+
+    def cell_of(self, x, y):
+        """Клетка сетки для точки."""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, obj):
+        """Добавляет объект в сетку."""
+        key = self.cell_of(obj.x, obj.y)
+        self.buckets.setdefault(key, []).append(obj)
+        self.cells[obj] = key
+
+    def remove(self, obj):
+        """Убирает объект из сетки (если он там есть)."""
+        key = self.cells.pop(obj, None)
+        if key is None:
+            return
+        bucket = self.buckets[key]
+        bucket.remove(obj)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, obj):
+        """Обновляет клетку объекта после перемещения."""
+        key = self.cell_of(obj.x, obj.y)
+        old_key = self.cells.get(obj)
+        if key == old_key:
+            return
+        if old_key is not None:
+            self.remove(obj)
+        self.buckets.setdefault(key, []).append(obj)
+        self.cells[obj] = key
+
+    def nearby(self, x, y, reach):
+        """Кандидаты из всех клеток, задевающих квадрат со стороной 2*reach вокруг точки."""
+        cs = self.cell_size
+        min_i = int((x - reach) // cs)
+        max_i = int((x + reach) // cs)
+        min_j = int((y - reach) // cs)
+        max_j = int((y + reach) // cs)
+        buckets = self.buckets
+        result = []
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                bucket = buckets.get((i, j))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+    def in_cells(self, keys):
+        """Все объекты из перечисленных клеток."""
+        buckets = self.buckets
+        result = []
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket:
+                result.extend(bucket)
+        return result
+
+    def query_radius(self, x, y, radius):
+        """Объекты, центры которых лежат в круге радиуса radius."""
+        r2 = radius * radius
+        result = []
+        for obj in self.nearby(x, y, radius):
+            dx = obj.x - x
+            dy = obj.y - y
+            if dx * dx + dy * dy <= r2:
+                result.append(obj)
+        return result
\ No newline at end of file
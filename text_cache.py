@@ -0,0 +1,46 @@
+# text_cache.py
+import arcade
+import pyglet
+
+
+class TextCache:
+    """Постоянные arcade.Text по ключу: раскладка глифов пересобирается только при смене текста."""
+    def __init__(self):
+        self.labels = {}   # ключ -> arcade.Text
+        self.shown = {}    # ключ -> (текст, цвет), выставленные последними
+        self.batches = {}  # ключ экрана -> (pyglet Batch, его тексты)
+
+    def draw(self, key, text, x, y, color, font_size, **kwargs):
+        """Рисует надпись key; текст и цвет меняются у готового объекта только при изменении."""
+        label = self.labels.get(key)
+        if label is None:
+            label = arcade.Text(text, x, y, color, font_size, **kwargs)
+            self.labels[key] = label
+            self.shown[key] = (text, color)
+        else:
+            shown_text, shown_color = self.shown[key]
+            if text != shown_text:
+                label.text = text
+            if color != shown_color:
+                label.color = color
+            if text != shown_text or color != shown_color:
+                self.shown[key] = (text, color)
+        label.draw()
+
+    def draw_static(self, key, build):
+        """Рисует неизменный набор надписей одним Batch, собранным при первом вызове.
+
+        build() возвращает список аргументов arcade.Text: (текст, x, y, цвет, размер, доп. параметры).
+        """
+        cached = self.batches.get(key)
+        if cached is None:
+            batch = pyglet.graphics.Batch()
+            texts = [arcade.Text(text, x, y, color, size, batch=batch, **kwargs)
+                     for text, x, y, color, size, kwargs in build()]
+            cached = (batch, texts)
+            self.batches[key] = cached
+        cached[0].draw()
+
+    def invalidate(self, key):
+        """Сбрасывает собранный экран key (например, после смены таблицы рекордов)."""
+        self.batches.pop(key, None)
\ No newline at end of file
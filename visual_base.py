@@ -5,13 +5,18 @@ import constants as const
 
 class VisualBase:
     """Базовая сущность для визуальных объектов (не анимированных)."""
-    def __init__(self, main_game, texture, pos=(10.5, 3.5), scale=0.7):
-        self.main_game = main_game
-        self.avatar = main_game.avatar
+    def __init__(self, simulation, texture, pos=(10.5, 3.5), scale=0.7):
+        self.simulation = simulation
+        self.avatar = simulation.avatar
         self.x, self.y = pos[0] * const.CELL_SIZE, pos[1] * const.CELL_SIZE
+        self.prev_x, self.prev_y = self.x, self.y  # положение на предыдущем тике
         self.width = 30
         self.height = 30
 
+    def render_position(self, alpha):
+        """Положение между двумя последними тиками (alpha от 0 до 1)."""
+        return self.prev_x + (self.x - self.prev_x) * alpha, self.prev_y + (self.y - self.prev_y) * alpha
+
     def draw(self):
         """Отрисовка объекта (пустая)."""
         pass
@@ -19,8 +24,8 @@ class VisualBase:
 
 class AnimatedVisual(VisualBase):
     """Анимированная визуальная сущность."""
-    def __init__(self, main_game, texture_path, pos=(11.5, 3.5), scale=0.8, animation_time=120):
-        super().__init__(main_game, texture_path, pos, scale)
+    def __init__(self, simulation, texture_path, pos=(11.5, 3.5), scale=0.8, animation_time=120):
+        super().__init__(simulation, texture_path, pos, scale)
         self.animation_time = animation_time
         self.animation_time_prev = 0
         self.current_image = 0
@@ -0,0 +1,52 @@
+# wall_renderer.py
+from arcade.shape_list import ShapeElementList, create_rectangle_filled
+import constants as const
+
+
+class WallRenderer:
+    """Отрисовка стен по чанкам: видимые собираются на GPU по требованию, дальние выгружаются."""
+    def __init__(self, level):
+        self.level = level
+        self.chunks = {}  # (ci, cj) -> ShapeElementList или None для чанка без стен
+
+    def build_chunk(self, ci, cj):
+        """Собирает стены чанка в мировых координатах."""
+        walls = self.level.chunk_walls(ci, cj)
+        if not walls:
+            return None
+        shape_list = ShapeElementList()
+        for x, y, texture_id in walls:
+            color = const.WALL_COLORS[(texture_id - 1) % len(const.WALL_COLORS)]
+            shape_list.append(create_rectangle_filled(
+                x * const.CELL_SIZE,
+                y * const.CELL_SIZE,
+                const.CELL_SIZE,
+                const.CELL_SIZE,
+                color
+            ))
+        return shape_list
+
+    def draw(self, camera_x, camera_y):
+        """Отрисовка видимых чанков со смещением камеры, следующей за игроком."""
+        cols, rows = self.level.chunk_range(camera_x - const.SCR_HW, camera_y - const.SCR_HH,
+                                            camera_x + const.SCR_HW, camera_y + const.SCR_HH)
+        position = (const.SCR_HW - camera_x, const.SCR_HH - camera_y)
+        for cj in rows:
+            for ci in cols:
+                key = (ci, cj)
+                if key not in self.chunks:
+                    self.chunks[key] = self.build_chunk(ci, cj)
+                shape_list = self.chunks[key]
+                if shape_list is not None:
+                    shape_list.position = position
+                    shape_list.draw()
+        self.unload_far(cols, rows)
+
+    def unload_far(self, cols, rows):
+        """Выгружает чанки дальше CHUNK_KEEP_MARGIN от видимых."""
+        margin = const.CHUNK_KEEP_MARGIN
+        if len(self.chunks) <= (len(cols) + 2 * margin) * (len(rows) + 2 * margin):
+            return
+        for ci, cj in list(self.chunks):
+            if not (cols.start - margin <= ci < cols.stop + margin and rows.start - margin <= cj < rows.stop + margin):
+                del self.chunks[(ci, cj)]
\ No newline at end of file